@@ -0,0 +1,54 @@
+import hashlib
+import os
+
+from fastapi.staticfiles import StaticFiles
+
+from app.config import settings
+
+STATIC_URL = "/static"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def _fingerprint(relative_path: str, digest: str) -> str:
+    root, ext = os.path.splitext(relative_path)
+    return f"{root}.{digest[:12]}{ext}"
+
+
+def build_manifest(directory: str) -> dict:
+    """Map every file under `directory` to a content-hashed name, e.g. css/base.css -> css/base.1a2b3c4d5e6f.css"""
+    manifest = {}
+    if not os.path.isdir(directory):
+        return manifest
+
+    for root, _, files in os.walk(directory):
+        for filename in files:
+            full_path = os.path.join(root, filename)
+            relative_path = os.path.relpath(full_path, directory).replace(os.sep, "/")
+            with open(full_path, "rb") as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+            manifest[relative_path] = _fingerprint(relative_path, digest)
+    return manifest
+
+
+# Built once at startup; assets only change with a deploy
+manifest = build_manifest(settings.STATIC_DIR)
+_originals = {hashed: original for original, hashed in manifest.items()}
+
+
+def static_url(path: str) -> str:
+    """Template helper returning the fingerprinted URL for a static asset"""
+    if settings.DEBUG:
+        # Unhashed while developing so edits show up on reload
+        return f"{STATIC_URL}/{path}"
+    return f"{STATIC_URL}/{manifest.get(path, path)}"
+
+
+class FingerprintedStaticFiles(StaticFiles):
+    """Serves fingerprinted names from the manifest with a long-lived immutable cache header"""
+
+    async def get_response(self, path: str, scope):
+        original = _originals.get(path)
+        response = await super().get_response(original or path, scope)
+        if original and response.status_code == 200:
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        return response
@@ -4,6 +4,9 @@ from typing import Optional
 class Settings(BaseSettings):
     MONGO_URI: str = ""  # Required, but default empty for mypy
     DB_NAME: str = "kabaddi_db"
+    MONGO_REPORTING_READ_PREFERENCE: str = "primary"  # Admin reporting reads; e.g. "secondaryPreferred" to take them off the primary
+    MONGO_REPORTING_MAX_STALENESS: int = 90  # Seconds a secondary may lag and still serve reporting reads (min 90, -1 = no bound)
+    MONGO_LOG_WRITE_CONCERN: str = "1"  # Write concern for AdminLog inserts: "1", "majority", or "0" for unacknowledged
     COLLECTION_NAME: str = "submissions"
     INPUT_FILE: str = "kabbadi  (Responses).xlsx"
     ADMIN_USER: str = "admin"
@@ -13,6 +16,41 @@ class Settings(BaseSettings):
     RESEND_API_KEY: Optional[str] = None
     APP_URL: str = "http://localhost:8000"
     VERCEL_URL: Optional[str] = None
+    DEBUG: bool = False  # Enables template auto-reload and disables the page render cache
+    TEMPLATE_DIR: str = "templates"
+    STATIC_DIR: str = "static"
+    TEMPLATE_CACHE_DIR: Optional[str] = None  # Jinja bytecode cache, defaults to the system temp dir
+    PAGE_CACHE_SIZE: int = 512  # Max number of rendered public pages kept in memory
+    COMPRESSION_MIN_SIZE: int = 500  # Responses smaller than this (bytes) are sent uncompressed
+    LIVE_UPDATES_SOURCE: str = "auto"  # "auto", "change_stream" or "poll"
+    LIVE_UPDATES_POLL_INTERVAL: float = 2.0  # Seconds between tail polls when change streams are unavailable
+    LIVE_UPDATES_HEARTBEAT: int = 15  # Seconds between SSE keep-alive comments
+    LIVE_UPDATES_RETRY_MAX: float = 60.0  # Longest wait (seconds) before restarting a failed event source; doubles from 1s
+    IDEMPOTENCY_CACHE_SIZE: int = 10000  # Form submissions remembered in memory for retry short-circuiting
+    IDEMPOTENCY_TTL: int = 86400  # Seconds an idempotency key stays valid (also the Mongo TTL index)
+    ARCHIVE_COLLECTION: str = "submissions_archive"
+    ARCHIVE_AFTER_DAYS: int = 30  # Days older than this are moved out of the hot submissions collection
+    ARCHIVE_BATCH_SIZE: int = 500
+    ARCHIVE_STATE_TTL: int = 30  # Seconds workers cache the archive cutoff; the job waits this long before deleting moved days
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int = 0  # 0 = one worker per CPU core
+    SERVER_LOOP: str = "auto"  # "auto" (uvloop when installed), "uvloop" or "asyncio"
+    SERVER_HTTP: str = "auto"  # "auto" (httptools when installed), "httptools" or "h11"
+    SERVER_KEEP_ALIVE: int = 5  # Seconds an idle keep-alive connection stays open; keep above the proxy's idle timeout
+    SERVER_BACKLOG: int = 2048  # Connections the kernel queues before refusing new ones
+    SERVER_GRACEFUL_TIMEOUT: int = 30  # Seconds workers get to drain in-flight requests on shutdown
+    SERVER_PRELOAD: bool = False  # Import the app once in a gunicorn master before forking workers
+    EMAIL_TRANSPORT: str = "resend"  # "resend", or "outbox" to keep messages in memory (offline runs)
+    DIGEST_ENABLED: bool = False  # Build and email each day's export after the form closes
+    DIGEST_TIME: str = "21:00"  # IST time of day the digest runs, HH:MM
+    DIGEST_RECIPIENTS: str = ""  # Comma-separated organizer emails
+    DIGEST_CLAIM_TIMEOUT: int = 600  # Seconds a worker's claim on the day's digest holds before another worker may take over
+    DIGEST_RETRY_INTERVAL: int = 300  # Seconds between attempts while the day's digest is not done
+    PROFILING_DIR: Optional[str] = None  # Where request profiles are kept, defaults to the system temp dir
+    PROFILING_MAX_FILES: int = 50  # Oldest profiles are deleted beyond this many
+    PROFILING_SAMPLE_RATE: float = 0.01  # Default fraction of requests profiled once profiling is switched on
+    PROFILING_HEADER: str = "X-Profile"  # Admin requests carrying this header are always profiled
 
     class Config:
         env_file = ".env"
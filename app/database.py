@@ -1,12 +1,129 @@
+"""
+MongoDB client setup and read/write routing.
+
+The client default stays on the primary whatever MONGO_URI says, so student-facing
+reads that validate a write (duplicate check, slot capacities, seat counters) always
+see the latest data. Admin reporting (dashboard, logs, the JSON API) reads through
+reporting(), which uses MONGO_REPORTING_READ_PREFERENCE with a bounded
+MONGO_REPORTING_MAX_STALENESS. It defaults to the primary; set it to e.g.
+"secondaryPreferred" to take those reads off the primary, accepting that a dashboard
+may then lag an admin's own edit by up to the staleness bound. Exports are built
+from the primary, since the stored workbook is served as authoritative.
+AdminLog writes use MONGO_LOG_WRITE_CONCERN instead of the client's write concern.
+
+Against a single server (or mongomock) every route ends up on the same node. To try
+the routing locally, start a three-member replica set as a stand-in for Atlas:
+
+    for port in 27017 27018 27019; do
+        mkdir -p /tmp/rs0-$port && mongod --replSet rs0 --port $port --dbpath /tmp/rs0-$port --fork --logpath /tmp/rs0-$port.log
+    done
+    mongosh --port 27017 --eval 'rs.initiate({_id: "rs0", members: [
+        {_id: 0, host: "localhost:27017"}, {_id: 1, host: "localhost:27018"}, {_id: 2, host: "localhost:27019"}]})'
+
+    MONGO_URI="mongodb://localhost:27017,localhost:27018,localhost:27019/?replicaSet=rs0" python -m app.database
+"""
+import argparse
+import asyncio
+from datetime import datetime
+
 from motor.motor_asyncio import AsyncIOMotorClient
 from beanie import init_beanie
+from pymongo import IndexModel, monitoring
+from pymongo.errors import OperationFailure
+from pymongo.read_preferences import Nearest, Primary, PrimaryPreferred, Secondary, SecondaryPreferred
+from pymongo.write_concern import WriteConcern
+
 from app.config import settings
-from app.models import Submission, Admin, Slot, AdminLog
+from app.models import Submission, Admin, Slot, AdminLog, IdempotencyRecord, SlotCounter, DailyExport, ProfilingConfig, ArchiveState
+
+DOCUMENT_MODELS = [Submission, Admin, Slot, AdminLog, IdempotencyRecord, SlotCounter, DailyExport, ProfilingConfig, ArchiveState]
+
+READ_PREFERENCE_MODES = {
+    "primary": Primary,
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+
+def read_preference(mode: str, max_staleness: int = -1):
+    """pymongo read preference for a mode name; max_staleness -1 means no bound"""
+    if mode not in READ_PREFERENCE_MODES:
+        raise ValueError(f"Unknown read preference {mode!r}, expected one of {', '.join(READ_PREFERENCE_MODES)}")
+    if mode == "primary":
+        return Primary()
+    return READ_PREFERENCE_MODES[mode](max_staleness=max_staleness)
+
+
+def write_concern(w: str) -> WriteConcern:
+    """WriteConcern from a setting such as "1", "0" or "majority" """
+    return WriteConcern(w=int(w) if w.isdigit() else w)
+
+
+REPORTING_READ_PREFERENCE = read_preference(settings.MONGO_REPORTING_READ_PREFERENCE, settings.MONGO_REPORTING_MAX_STALENESS)
+LOG_WRITE_CONCERN = write_concern(settings.MONGO_LOG_WRITE_CONCERN)
+
+
+def routed(collection, read_preference=None, codec_options=None):
+    """
+    The same collection with another read preference and/or codec options; it shares
+    the client's connection pool. (Built through the database rather than with_options,
+    which mongomock-motor does not wrap.)
+    """
+    return collection.database.get_collection(collection.name, read_preference=read_preference, codec_options=codec_options)
+
+
+def reporting(collection, codec_options=None):
+    """A collection for admin reporting reads, which may be served by a secondary"""
+    return routed(collection, REPORTING_READ_PREFERENCE, codec_options)
+
+
+# IndexOptionsConflict, IndexKeySpecsConflict: an existing index differs from the declared one
+INDEX_CONFLICT_CODES = (85, 86)
+
+
+async def create_indexes_skipping_conflicts():
+    """Create each model's declared indexes one by one, leaving out those that conflict with an existing one"""
+    for model in DOCUMENT_MODELS:
+        collection = model.get_pymongo_collection()
+        for index in getattr(model.Settings, "indexes", []):
+            index = index if isinstance(index, IndexModel) else IndexModel(index)
+            try:
+                await collection.create_indexes([index])
+            except OperationFailure as e:
+                if e.code not in INDEX_CONFLICT_CODES:
+                    raise
+                print(f"[DB Init] Skipping index {index.document['key']} on {collection.name}: {e}")
+
+
+async def init_db(event_listeners=None):
+    # Keyword options override MONGO_URI: the default route is always the primary
+    client = AsyncIOMotorClient(settings.MONGO_URI, readPreference="primary", event_listeners=event_listeners or [])
+    # Only creates missing indexes; superseded ones are dropped by app/services/migrate_indexes.py
+    try:
+        await init_beanie(
+            database=client[settings.DB_NAME],
+            document_models=DOCUMENT_MODELS
+        )
+    except OperationFailure as e:
+        if e.code not in INDEX_CONFLICT_CODES:
+            raise
+        # E.g. the non-unique (reg_no, date_str) index a deployment had before: keep serving on it
+        # (deployments without a pre-deploy step can't run the migration first)
+        print(f"[DB Init] An existing index conflicts with app/models.py, run python -m app.services.migrate_indexes: {e}")
+        await init_beanie(
+            database=client[settings.DB_NAME],
+            document_models=DOCUMENT_MODELS,
+            skip_indexes=True
+        )
+        await create_indexes_skipping_conflicts()
+
+    # Audit log writes don't need the durability of submissions
+    AdminLog.get_settings().pymongo_collection = client[settings.DB_NAME].get_collection(
+        AdminLog.get_collection_name(), write_concern=LOG_WRITE_CONCERN
+    )
 
-async def init_db():
-    client = AsyncIOMotorClient(settings.MONGO_URI)
-    await init_beanie(database=client[settings.DB_NAME], document_models=[Submission, Admin, Slot, AdminLog])
-    
     # Bootstrap Admin if none exists
     if await Admin.count() == 0:
         print("[DB Init] Creating default admin user...")
@@ -14,3 +131,49 @@ async def init_db():
         hashed_pw = Hash.bcrypt(settings.ADMIN_PASS)
         default_admin = Admin(username=settings.ADMIN_USER, password=hashed_pw)
         await default_admin.insert()
+
+
+class ServerRecorder(monitoring.CommandListener):
+    """Remembers which server answered each command, for the routing check"""
+
+    def __init__(self):
+        self.servers = {}
+
+    def started(self, event):
+        self.servers[event.request_id] = event.connection_id
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+async def check_routing() -> dict:
+    """Run one read per route and one audit log write; returns the server ("host", port) each used"""
+    recorder = ServerRecorder()
+    await init_db(event_listeners=[recorder])
+
+    def last_server():
+        return recorder.servers[max(recorder.servers)]
+
+    used = {}
+    await Submission.get_pymongo_collection().find_one({})
+    used["validation (primary)"] = last_server()
+    await reporting(Submission.get_pymongo_collection()).find_one({})
+    used[f"reporting ({settings.MONGO_REPORTING_READ_PREFERENCE})"] = last_server()
+    # Same write concern as AdminLog, on a scratch collection so the audit log stays clean
+    database = Submission.get_pymongo_collection().database
+    scratch = database.get_collection("routing_check", write_concern=LOG_WRITE_CONCERN)
+    await scratch.insert_one({"checked_at": datetime.utcnow()})
+    used[f"admin log write (w={LOG_WRITE_CONCERN.document.get('w', 'default')})"] = last_server()
+    await database.drop_collection("routing_check")
+    return used
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show which replica set member each route reads from")
+    parser.parse_args()
+
+    for route, (host, port) in asyncio.run(check_routing()).items():
+        print(f"[Routing] {route}: {host}:{port}")
@@ -6,14 +6,15 @@ from app.config import settings
 
 signer = URLSafeSerializer(settings.ADMIN_PASS, salt="admin-session")
 
-def get_current_admin(admin_session: Optional[str] = Cookie(None)):
+def is_admin_session(admin_session: Optional[str]) -> bool:
     if not admin_session:
-        return None
+        return False
         
     try:
         data = signer.loads(admin_session)
-        if not data or "user" not in data:
-            return None
-        return True
+        return bool(data) and "user" in data
     except BadSignature:
-        return None
+        return False
+
+def get_current_admin(admin_session: Optional[str] = Cookie(None)):
+    return True if is_admin_session(admin_session) else None
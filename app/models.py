@@ -1,8 +1,10 @@
 
 from beanie import Document
+from pymongo import IndexModel
 from pydantic import Field, EmailStr
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
+from app.config import settings
 
 class Submission(Document):
     reg_no: str
@@ -12,15 +14,22 @@ class Submission(Document):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     date_str: Optional[str] = None # Optional for backward compatibility with old records
     deleted_at: Optional[datetime] = None # For soft delete functionality
+    updated_at: datetime = Field(default_factory=datetime.utcnow) # Set by every change; the live-update poll tails it
 
     class Settings:
         name = "submissions"
         indexes = [
-            [
-                ("reg_no", 1),
-                ("date_str", 1)
-            ],
-            [("email", 1)]  # Index for search
+            # One submission per student per day; submit_form relies on it against double submits
+            IndexModel([("reg_no", 1), ("date_str", 1)], unique=True),
+            [("email", 1)],  # Index for search
+            # Dashboard, download and API day views: date_str + deleted_at equality, newest first.
+            # deleted_at sits in the key rather than in a partial index ({deleted_at: null}):
+            # one index then serves both the active and the trash view of a day.
+            [("date_str", 1), ("deleted_at", 1), ("created_at", -1), ("_id", -1)],
+            # Search and empty trash: deleted_at filter without a day
+            [("deleted_at", 1), ("created_at", -1), ("_id", -1)],
+            [("created_at", -1)],  # Archive job (no deleted_at filter)
+            [("updated_at", 1), ("_id", 1)]  # Live-update tail poll
         ]
 
 class Admin(Document):
@@ -29,13 +38,32 @@ class Admin(Document):
 
     class Settings:
         name = "admins"
+        indexes = [
+            [("username", 1)]  # Login lookup
+        ]
 
 class Slot(Document):
     time: str
     is_active: bool = True
+    capacity: Optional[int] = None  # Max sign-ups per day, None = unlimited
 
     class Settings:
         name = "slots"
+        indexes = [
+            [("is_active", 1), ("time", 1)],  # Active slot lists (covers the time projection)
+            [("time", 1)]  # Duplicate check when adding a slot
+        ]
+
+class SlotCounter(Document):
+    slot: str  # Slot.time
+    date_str: str  # Same IST day key as Submission.date_str
+    taken: int = 0  # Seats taken, only ever changed with atomic $inc (see app/services/capacity.py)
+
+    class Settings:
+        name = "slot_counters"
+        indexes = [
+            IndexModel([("slot", 1), ("date_str", 1)], unique=True)  # One counter per slot per day
+        ]
 
 class AdminLog(Document):
     log_type: str = "admin"  # "admin" for activity logs, "error" for error logs
@@ -50,10 +78,57 @@ class AdminLog(Document):
     class Settings:
         name = "admin_logs"
         indexes = [
-            [("created_at", -1)],  # Index for efficient pagination
-            [("action", 1)],  # Index for filtering by action
-            [("log_type", 1)],  # Index for filtering by log type
-            [("level", 1)]  # Index for filtering by level
+            # Newest first with the _id tie-breaker of the API's cursor pagination (also serves the logs page)
+            [("created_at", -1), ("_id", -1)],
+            # Filter + newest-first sort, as issued by the logs page and API
+            [("action", 1), ("created_at", -1)],
+            [("log_type", 1), ("level", 1), ("created_at", -1)],
+            [("level", 1), ("created_at", -1)]
+        ]
+
+
+
+class IdempotencyRecord(Document):
+    key: str  # One-time token posted by the submission form
+    redirect_url: str  # Where the original request redirected to
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "idempotency_keys"
+        indexes = [
+            IndexModel([("key", 1)], unique=True),
+            IndexModel([("created_at", 1)], expireAfterSeconds=settings.IDEMPOTENCY_TTL)  # TTL cleanup
         ]
 
+class ProfilingConfig(Document):
+    enabled: bool = False  # Switched from /admin/profiles, read by every worker
+    sample_rate: float = settings.PROFILING_SAMPLE_RATE
+
+    class Settings:
+        name = "profiling_config"
+
+class ArchiveState(Document):
+    archived_before: Optional[str] = None  # First IST day (YYYY-MM-DD) still served from the hot collection; set by the archive job
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
 
+    class Settings:
+        name = "archive_state"
+
+class DailyExport(Document):
+    date_str: str  # IST day the workbook covers
+    filename: Optional[str] = None
+    content: Optional[bytes] = None  # xlsx bytes, None until the digest job has built it
+    headcounts: Dict[str, int] = {}  # Submissions per slot, as sent in the digest email
+    total: int = 0
+    stale: bool = False  # Set when a submission of this day changes after the build
+    version: int = 0  # Bumped by every invalidation, so a build that raced one is not stored as fresh
+    claimed_at: Optional[datetime] = Field(default_factory=datetime.utcnow)  # Lease of the worker running the day's job, None once released
+    generated_at: Optional[datetime] = None
+    emailed_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None  # Built, stored and emailed (or nobody to email); the job is done
+
+    class Settings:
+        name = "daily_exports"
+        indexes = [
+            IndexModel([("date_str", 1)], unique=True)  # One export per day; also makes the job claim exclusive
+        ]
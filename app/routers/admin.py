@@ -1,19 +1,21 @@
 
 from fastapi import APIRouter, Request, Form, Depends, Query
-from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse, RedirectResponse, StreamingResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, StreamingResponse, Response, FileResponse
 from datetime import datetime
 from typing import List, Optional
 from beanie import PydanticObjectId
 import re
 
 from app.config import settings
+from app.database import reporting
 from app.dependencies import get_current_admin
-from app.services.excel_service import generate_excel_bytes
-from app.models import Submission, Admin, Slot, AdminLog
+from app.templating import templates
+from app.services import live_updates, capacity, digest, profiling, reads
+from app.utils.dates import IST, parse_ist_date, resolve_ist_date, to_ist, utc_day_bounds
+from app.utils.serialization import dumps
+from app.models import Submission, Admin, AdminLog, ProfilingConfig
 
 router = APIRouter(prefix="/admin", tags=["admin"])
-templates = Jinja2Templates(directory="templates")
 
 async def log_admin_action(request: Request, action: str, details: str = None, admin_username: str = None, log_type: str = "admin", level: str = None):
     """Log admin activity or errors to MongoDB"""
@@ -44,10 +46,38 @@ async def log_error(request: Request, error_message: str, details: str = None):
     """Convenience function to log errors"""
     await log_admin_action(request, "error", error_message if details is None else f"{error_message}: {details}", log_type="error", level="ERROR")
 
-async def get_slot_times():
-    """Fetch active slot times from MongoDB"""
-    slots = await Slot.find(Slot.is_active == True).to_list()
-    return [s.time for s in slots]
+# Action categories used by the log filters
+LOG_ACTION_CATEGORIES = {
+    "auth": ["login", "login_failed", "logout"],
+    "data": ["edit", "delete", "download"],
+    "system": ["settings"]
+}
+
+# Fields shown in log exports and the JSON API, in CSV column order
+LOG_FIELDS = {"created_at": 1, "log_type": 1, "level": 1, "action": 1, "details": 1, "admin_username": 1, "ip_address": 1, "user_agent": 1}
+LOG_COLUMNS = list(LOG_FIELDS)
+
+# Leading characters that make spreadsheet apps treat a CSV cell as a formula
+CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+def csv_cell(value) -> str:
+    """A CSV cell that opens as plain text: formula-like strings get a leading quote"""
+    value = "" if value is None else str(value)
+    return "'" + value if value.startswith(CSV_FORMULA_PREFIXES) else value
+
+def build_log_filter(filter: Optional[str] = None, level: Optional[str] = None) -> dict:
+    """Build the raw MongoDB filter for the log views from the filter/level query params"""
+    query_filter = {}
+    
+    if filter == "errors":
+        query_filter["log_type"] = "error"
+    elif filter and filter in LOG_ACTION_CATEGORIES:
+        query_filter["action"] = {"$in": LOG_ACTION_CATEGORIES[filter]}
+    
+    if level and level in ["INFO", "WARNING", "ERROR"]:
+        query_filter["level"] = level
+    
+    return query_filter
 
 from itsdangerous import URLSafeSerializer
 from app.utils.auth import Hash
@@ -101,61 +131,32 @@ async def admin_dashboard(
     if not is_admin:
         return RedirectResponse(url="/admin/login")
     
-    from datetime import timezone, timedelta
-    IST = timezone(timedelta(hours=5, minutes=30))
-    
-    target_date = datetime.now(IST) # Default needed for template even if searching
+    target_date = resolve_ist_date(date) # Needed for the template even when searching
     
-    # Criteria list for query
-    criteria = []
+    # Raw filter for the read-only query layer
+    query = {}
     
     # 1. Filter by View (Trash vs Active)
     if view == "trash":
-        criteria.append(Submission.deleted_at != None)
+        query["deleted_at"] = {"$ne": None}
     else:
-        criteria.append(Submission.deleted_at == None) # Default to active only
+        query["deleted_at"] = None # Default to active only
 
     # 2. Filter by Search OR Date
     if search:
         # Search by email (case-insensitive) - Prefix match
-        import re
         escaped_search = re.escape(search)
-        criteria.append({"email": {"$regex": f"^{escaped_search}", "$options": "i"}})
+        query["email"] = {"$regex": f"^{escaped_search}", "$options": "i"}
         
         # When searching, we typically ignore date to allow finding records from past
         # So we don't add date criteria here
                 
     else:
-        # Date-based filtering (only if no search)
-        if date:
-            try:
-                # Parse requested date and set to IST
-                target_date = datetime.strptime(date, "%Y-%m-%d").replace(tzinfo=IST)
-            except:
-                target_date = datetime.now(IST)
-        else:
-            target_date = datetime.now(IST)
-
-        # Calculate start and end of day in IST
-        start_of_day_ist = target_date.replace(hour=0, minute=0, second=0, microsecond=0)
-        end_of_day_ist = target_date.replace(hour=23, minute=59, second=59, microsecond=999999)
-
-        # Convert to UTC for MongoDB Query
-        start_of_day_utc = start_of_day_ist.astimezone(timezone.utc).replace(tzinfo=None)
-        end_of_day_utc = end_of_day_ist.astimezone(timezone.utc).replace(tzinfo=None)
-
-        criteria.append(Submission.created_at >= start_of_day_utc)
-        criteria.append(Submission.created_at <= end_of_day_utc)
-    
-    # Execute Query
-    submissions = await Submission.find(*criteria).sort("-created_at").to_list()
+        # Date-based filtering (only if no search): indexed equality on the stored IST day
+        query["date_str"] = target_date.strftime("%Y-%m-%d")
     
-    # Convert created_at from UTC to IST for display
-    for sub in submissions:
-        if sub.created_at:
-            # MongoDB returns naive UTC, convert to IST
-            utc_time = sub.created_at.replace(tzinfo=timezone.utc)
-            sub.created_at = utc_time.astimezone(IST)
+    # Execute Query (archived days and searches also read the archive collection, whose rows are read-only)
+    submissions = await reads.submission_rows(query, None if search else target_date)
     
     return templates.TemplateResponse("dashboard.html", {
         "request": request, 
@@ -165,6 +166,29 @@ async def admin_dashboard(
         "current_view": view
     })
 
+@router.get("/dashboard/events")
+async def dashboard_events(request: Request, is_admin: bool = Depends(get_current_admin)):
+    """Server-Sent Events stream of submission changes for open dashboards"""
+    if not is_admin:
+        return RedirectResponse(url="/admin/login")
+
+    import asyncio
+
+    async def event_stream():
+        async with live_updates.broker.subscribe() as queue:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    yield await asyncio.wait_for(queue.get(), timeout=settings.LIVE_UPDATES_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/settings", response_class=HTMLResponse)
 async def admin_settings_page(request: Request, is_admin: bool = Depends(get_current_admin), success: Optional[str] = None):
     if not is_admin:
@@ -216,6 +240,61 @@ async def update_admin_settings(
         
     return RedirectResponse(url="/admin/dashboard")
 
+@router.get("/profiles", response_class=HTMLResponse)
+async def admin_profiles_page(request: Request, is_admin: bool = Depends(get_current_admin), success: Optional[str] = None):
+    if not is_admin:
+        return RedirectResponse(url="/admin/login")
+    
+    config = await ProfilingConfig.find_one() or ProfilingConfig()
+    profiles = profiling.store.entries()
+    
+    return templates.TemplateResponse("admin_profiles.html", {
+        "request": request,
+        "config": config,
+        "profiles": profiles,
+        "header": settings.PROFILING_HEADER,
+        "max_files": profiling.store.max_files,
+        "message": "Profiling settings saved." if success else None
+    })
+
+@router.post("/profiles")
+async def update_profiling(
+    request: Request,
+    enabled: Optional[str] = Form(None),
+    sample_rate: float = Form(settings.PROFILING_SAMPLE_RATE),
+    is_admin: bool = Depends(get_current_admin)
+):
+    if not is_admin:
+        return RedirectResponse(url="/admin/login")
+    
+    config = await ProfilingConfig.find_one() or ProfilingConfig()
+    config.enabled = bool(enabled)
+    config.sample_rate = min(max(sample_rate, 0.0), 1.0)
+    await config.save()
+    profiling.config_cache.invalidate()  # Other workers pick it up within the cache TTL
+    
+    await log_admin_action(request, "settings", f"Profiling {'enabled' if config.enabled else 'disabled'} (sample rate {config.sample_rate})")
+    return RedirectResponse(url="/admin/profiles?success=1", status_code=303)
+
+@router.post("/profiles/clear")
+async def clear_profiles(request: Request, is_admin: bool = Depends(get_current_admin)):
+    if not is_admin:
+        return RedirectResponse(url="/admin/login")
+    
+    profiling.store.clear()
+    await log_admin_action(request, "settings", "Cleared stored request profiles")
+    return RedirectResponse(url="/admin/profiles", status_code=303)
+
+@router.get("/profiles/{name}")
+async def download_profile(name: str, is_admin: bool = Depends(get_current_admin)):
+    if not is_admin:
+        return RedirectResponse(url="/admin/login")
+    
+    path = profiling.store.path(name)
+    if not path:
+        return RedirectResponse(url="/admin/profiles", status_code=303)
+    return FileResponse(path, media_type="application/octet-stream", filename=name)
+
 @router.get("/edit/{id}", response_class=HTMLResponse)
 async def edit_submission_page(request: Request, id: PydanticObjectId, success: Optional[str] = None, error: Optional[str] = None, is_admin: bool = Depends(get_current_admin)):
     if not is_admin:
@@ -225,13 +304,6 @@ async def edit_submission_page(request: Request, id: PydanticObjectId, success:
     if not submission:
          return RedirectResponse(url="/admin/dashboard")
     
-    # Convert created_at from UTC to IST for display
-    from datetime import timezone, timedelta
-    IST = timezone(timedelta(hours=5, minutes=30))
-    if submission.created_at:
-        utc_time = submission.created_at.replace(tzinfo=timezone.utc)
-        submission.created_at = utc_time.astimezone(IST)
-    
     message = "Submission updated successfully!" if success else None
 
     return templates.TemplateResponse("edit.html", {
@@ -265,10 +337,22 @@ async def edit_submission(
         # Submission was deleted - redirect to dashboard
         return RedirectResponse(url="/admin/dashboard", status_code=303)
     
+    slot_capacities = await capacity.slot_capacities(selected_slots)
+    state = capacity.rebooked_state(submission)
+    try:
+        async with capacity.rebook_submission(submission, selected_slots, slot_capacities):
+            await capacity.update_rebooked(state, {"$set": {"reg_no": reg_no, "email": email, "slots": selected_slots}})
+    except capacity.SlotFullError as e:
+        import urllib.parse
+        error_msg = urllib.parse.quote(f"Slot {e.slot} is full. Raise its capacity in Manage Slots first.")
+        return RedirectResponse(url=f"/admin/edit/{id}?error={error_msg}", status_code=303)
+    except capacity.SubmissionChangedError:
+        return RedirectResponse(url=f"/admin/edit/{id}?error=The+submission+was+changed+meanwhile.+Check+it+and+try+again.", status_code=303)
     submission.reg_no = reg_no
     submission.email = email
     submission.slots = selected_slots
-    await submission.save()
+    live_updates.broker.publish(live_updates.document_event("updated", submission), local=True)
+    await digest.invalidate(capacity.submission_day(submission))
     
     await log_admin_action(request, "edit", f"Edited submission {id} (reg_no: {reg_no})")
         
@@ -281,11 +365,19 @@ async def delete_submission(request: Request, id: PydanticObjectId, is_admin: bo
         return RedirectResponse(url="/admin/login")
     
     submission = await Submission.get(id)
-    if submission:
+    if submission and submission.deleted_at is None:
         reg_no = submission.reg_no
-        # Soft delete
-        submission.deleted_at = datetime.utcnow()
-        await submission.save()
+        # Soft delete, freeing its seats (a repeated delete that lost the race does nothing)
+        state = capacity.rebooked_state(submission)
+        deleted_at = datetime.utcnow()
+        try:
+            async with capacity.rebook_submission(submission, [], {}):
+                await capacity.update_rebooked(state, {"$set": {"deleted_at": deleted_at}})
+        except capacity.SubmissionChangedError:
+            return RedirectResponse(url="/admin/dashboard?view=active", status_code=303)
+        submission.deleted_at = deleted_at
+        live_updates.broker.publish(live_updates.document_event("updated", submission), local=True)
+        await digest.invalidate(capacity.submission_day(submission))
         await log_admin_action(request, "delete", f"Soft deleted submission (reg_no: {reg_no})")
         
     return RedirectResponse(url="/admin/dashboard?view=active", status_code=303)
@@ -296,11 +388,19 @@ async def restore_submission(request: Request, id: PydanticObjectId, is_admin: b
         return RedirectResponse(url="/admin/login")
     
     submission = await Submission.get(id)
-    if submission:
+    # Already active (e.g. a double-clicked Restore): it holds its seats, nothing to do
+    if submission and submission.deleted_at is not None:
         reg_no = submission.reg_no
-        # Restore
+        # Restore; the admin's call, so seats are taken back even past capacity
+        state = capacity.rebooked_state(submission)
+        try:
+            async with capacity.rebook([], submission.slots, capacity.submission_day(submission), {}):
+                await capacity.update_rebooked(state, {"$set": {"deleted_at": None}})
+        except capacity.SubmissionChangedError:
+            return RedirectResponse(url="/admin/dashboard?view=trash", status_code=303)
         submission.deleted_at = None
-        await submission.save()
+        live_updates.broker.publish(live_updates.document_event("updated", submission), local=True)
+        await digest.invalidate(capacity.submission_day(submission))
         await log_admin_action(request, "restore", f"Restored submission (reg_no: {reg_no})")
         
     return RedirectResponse(url="/admin/dashboard?view=trash", status_code=303)
@@ -310,49 +410,22 @@ async def download_excel(request: Request, is_admin: bool = Depends(get_current_
     if not is_admin:
         return RedirectResponse(url="/admin/login")
 
-    from datetime import timezone, timedelta
-    IST = timezone(timedelta(hours=5, minutes=30))
+    target_date = resolve_ist_date(date)
+    date_str = target_date.strftime("%Y-%m-%d")
 
-    if date:
-        try:
-            target_date = datetime.strptime(date, "%Y-%m-%d").replace(tzinfo=IST)
-        except:
-            target_date = datetime.now(IST)
+    # The digest job already built this day's workbook off-peak unless something changed since
+    export = await digest.stored_export(date_str)
+    if export:
+        content, total, source = export.content, export.total, "stored"
     else:
-        target_date = datetime.now(IST)
-
-    start_of_day_ist = target_date.replace(hour=0, minute=0, second=0, microsecond=0)
-    end_of_day_ist = target_date.replace(hour=23, minute=59, second=59, microsecond=999999)
-
-    # Convert to UTC
-    start_of_day_utc = start_of_day_ist.astimezone(timezone.utc).replace(tzinfo=None)
-    end_of_day_utc = end_of_day_ist.astimezone(timezone.utc).replace(tzinfo=None)
-
-    # Filter by date/time (UTC)
-    criteria = [
-        Submission.created_at >= start_of_day_utc,
-        Submission.created_at <= end_of_day_utc,
-        Submission.deleted_at == None  # Exclude soft deleted items
-    ]
-
-    submissions = await Submission.find(*criteria).to_list()
+        content, _, total = await digest.build_export(target_date)
+        source = "built"
     
-    await log_admin_action(request, "download", f"Downloaded Excel for {target_date.strftime('%Y-%m-%d')} ({len(submissions)} submissions)")
+    await log_admin_action(request, "download", f"Downloaded Excel for {date_str} ({total} submissions, {source})")
     
-    # Adapt Beanie models to dict for Excel Service
-    submissions_dicts = [s.dict() for s in submissions]
-    
-    # Get slots from MongoDB
-    slot_times = await get_slot_times()
-    
-    from starlette.concurrency import run_in_threadpool
-    
-    # Run synchronous Pandas code in a thread pool to avoid blocking the event loop
-    output = await run_in_threadpool(generate_excel_bytes, submissions_dicts, slot_times, target_date)
-    
-    filename = f"kabaddi_{target_date.day}_{target_date.month}_{target_date.year}.xlsx"
-    return StreamingResponse(
-        output, 
+    filename = digest.export_filename(target_date)
+    return Response(
+        content=content, 
         media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
         headers={"Content-Disposition": f"attachment; filename={filename}"}
     )
@@ -365,8 +438,15 @@ async def hard_delete_submission(request: Request, id: PydanticObjectId, is_admi
     submission = await Submission.get(id)
     if submission:
         reg_no = submission.reg_no
-        # Hard delete - remove from DB entirely
-        await submission.delete()
+        # Hard delete - remove from DB entirely (frees its seats if it wasn't in the trash)
+        try:
+            async with capacity.rebook_submission(submission, [], {}):
+                await capacity.delete_rebooked(capacity.rebooked_state(submission))
+        except capacity.SubmissionChangedError:
+            return RedirectResponse(url="/admin/dashboard?view=trash", status_code=303)
+        live_updates.broker.publish(live_updates.document_event("removed", submission), local=True)
+        if submission.deleted_at is None:
+            await digest.invalidate(capacity.submission_day(submission))
         await log_admin_action(request, "hard_delete", f"Permanently deleted submission (reg_no: {reg_no})")
         
     return RedirectResponse(url="/admin/dashboard?view=trash", status_code=303)
@@ -383,54 +463,97 @@ async def empty_trash(request: Request, is_admin: bool = Depends(get_current_adm
     if count > 0:
         # Delete them all
         await Submission.find(Submission.deleted_at != None).delete()
+        for item in trash_items:
+            live_updates.broker.publish(live_updates.document_event("removed", item), local=True)
         await log_admin_action(request, "empty_trash", f"Permanently deleted {count} items from trash")
         
     return RedirectResponse(url="/admin/dashboard?view=trash", status_code=303)
 
+@router.get("/logs/export")
+async def export_logs(
+    request: Request,
+    is_admin: bool = Depends(get_current_admin),
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    filter: Optional[str] = Query(None),
+    level: Optional[str] = Query(None),
+    log_type: Optional[str] = Query(None),
+    action: Optional[str] = Query(None),
+    start: Optional[str] = Query(None),
+    end: Optional[str] = Query(None)
+):
+    """Stream every matching log straight from a batched cursor, newest first"""
+    if not is_admin:
+        return RedirectResponse(url="/admin/login")
+    
+    query_filter = build_log_filter(filter, level)
+    if log_type:
+        query_filter["log_type"] = log_type
+    if action:
+        query_filter["action"] = action
+    
+    # start/end are inclusive IST days (YYYY-MM-DD); a bad one would otherwise export the wrong range
+    created_at = {}
+    try:
+        if start:
+            created_at["$gte"] = utc_day_bounds(parse_ist_date(start))[0]
+        if end:
+            created_at["$lte"] = utc_day_bounds(parse_ist_date(end))[1]
+    except ValueError:
+        return Response(content=dumps({"detail": "start and end must be dates as YYYY-MM-DD"}), status_code=400, media_type="application/json")
+    if created_at:
+        query_filter["created_at"] = created_at
+    
+    params = {"filter": filter, "level": level, "log_type": log_type, "action": action, "start": start, "end": end}
+    described = ", ".join(f"{name}={value}" for name, value in params.items() if value) or "all"
+    await log_admin_action(request, "download", f"Exported logs as {format} ({described})")
+    
+    cursor = reporting(AdminLog.get_pymongo_collection()).find(query_filter, dict(LOG_FIELDS)).sort("created_at", -1).batch_size(1000)
+    
+    if format == "ndjson":
+        async def ndjson_rows():
+            async for doc in cursor:
+                doc.pop("_id", None)
+                yield dumps(doc) + b"\n"
+        body, media_type = ndjson_rows(), "application/x-ndjson"
+    else:
+        import csv
+        import io
+        
+        async def csv_rows():
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(LOG_COLUMNS)
+            rows = 0
+            async for doc in cursor:
+                if doc.get("created_at"):
+                    doc["created_at"] = to_ist(doc["created_at"]).isoformat()
+                writer.writerow([csv_cell(doc.get(column)) for column in LOG_COLUMNS])
+                rows += 1
+                # Flush roughly one cursor batch at a time so memory stays flat
+                if rows % 1000 == 0 or rows == 1:
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+            yield buffer.getvalue()
+        body, media_type = csv_rows(), "text/csv"
+    
+    filename = f"admin_logs_{datetime.now(IST).strftime('%Y%m%d_%H%M')}.{format}"
+    return StreamingResponse(body, media_type=media_type, headers={"Content-Disposition": f"attachment; filename={filename}"})
+
 @router.get("/logs", response_class=HTMLResponse)
 async def admin_logs_page(request: Request, is_admin: bool = Depends(get_current_admin), page: int = Query(1, ge=1), filter: Optional[str] = Query(None), level: Optional[str] = Query(None)):
     if not is_admin:
         return RedirectResponse(url="/admin/login")
     
-    from datetime import timezone, timedelta
-    IST = timezone(timedelta(hours=5, minutes=30))
-    
-    # Define action categories
-    action_categories = {
-        "auth": ["login", "login_failed", "logout"],
-        "data": ["edit", "delete", "download"],
-        "system": ["settings"]
-    }
-    
     per_page = 20
     skip = (page - 1) * per_page
     
-    # Build query based on filter and level
-    query_filter = {}
-    
-    if filter == "errors":
-        query_filter["log_type"] = "error"
-    elif filter and filter in action_categories:
-        query_filter["action"] = {"$in": action_categories[filter]}
-    
-    if level and level in ["INFO", "WARNING", "ERROR"]:
-        query_filter["level"] = level
-    
-    query = AdminLog.find(query_filter) if query_filter else AdminLog.find()
+    query_filter = build_log_filter(filter, level)
     
-    # Get total count for pagination
-    total_logs = await query.count()
+    # Page (newest first, timestamps already in IST) and total count in one round of queries
+    logs, total_logs = await reads.log_page(query_filter, skip, per_page)
     total_pages = max(1, (total_logs + per_page - 1) // per_page)  # Ceiling division, min 1
     
-    # Fetch logs with pagination, sorted by newest first
-    logs = await query.sort("-created_at").skip(skip).limit(per_page).to_list()
-    
-    # Convert timestamps to IST for display
-    for log in logs:
-        if log.created_at:
-            utc_time = log.created_at.replace(tzinfo=timezone.utc)
-            log.created_at = utc_time.astimezone(IST)
-    
     return templates.TemplateResponse("admin_logs.html", {
         "request": request,
         "logs": logs,
@@ -0,0 +1,146 @@
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import Response, StreamingResponse
+from datetime import datetime
+from typing import Optional
+from bson import ObjectId
+from bson.errors import InvalidId
+import base64
+import re
+
+from app.database import reporting
+from app.dependencies import get_current_admin
+from app.models import Submission, AdminLog
+from app.routers.admin import build_log_filter, LOG_FIELDS
+from app.services import archive
+from app.utils.dates import resolve_ist_date
+from app.utils.serialization import dumps
+
+router = APIRouter(prefix="/admin/api", tags=["admin-api"])
+
+# Projections keep the wire format stable and skip fields nobody asked for
+SUBMISSION_FIELDS = {"reg_no": 1, "email": 1, "slots": 1, "edit_count": 1, "created_at": 1, "date_str": 1, "deleted_at": 1}
+
+# Newest first; _id breaks ties between documents created in the same millisecond
+SORT_ORDER = [("created_at", -1), ("_id", -1)]
+
+def json_response(content, status_code: int = 200) -> Response:
+    return Response(content=dumps(content), status_code=status_code, media_type="application/json")
+
+def encode_cursor(doc: dict) -> str:
+    raw = f"{doc['created_at'].isoformat()}|{doc['_id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str) -> dict:
+    """Turn an opaque cursor back into a filter for the documents after it"""
+    created_at, _id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+    created_at, _id = datetime.fromisoformat(created_at), ObjectId(_id)
+    return {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "_id": {"$lt": _id}}
+    ]}
+
+async def merge_newest_first(hot, cold):
+    """
+    Merge two cursors that are each sorted by SORT_ORDER into one, marking the cold
+    store's documents "archived": true (they are read-only). A document caught mid-move
+    sits in both stores with the same sort key, so it comes out twice in a row and is
+    only yielded once, from the hot store.
+    """
+    async def tagged(cursor):
+        async for doc in cursor:
+            doc["archived"] = True
+            yield doc
+
+    streams = [hot.__aiter__(), tagged(cold)]
+    heads = [await anext(stream, None) for stream in streams]
+    last_id = None
+    while any(head is not None for head in heads):
+        i = max((i for i, head in enumerate(heads) if head is not None), key=lambda i: (heads[i]["created_at"], heads[i]["_id"]))
+        doc = heads[i]
+        heads[i] = await anext(streams[i], None)
+        if doc["_id"] != last_id:
+            last_id = doc["_id"]
+            yield doc
+
+async def paginate(collection, query: dict, projection: dict, limit: int, cursor: Optional[str], format: str, archive=None):
+    """
+    Return one page of raw documents as JSON, or stream every match as NDJSON. With an
+    archive collection both stores are read and merged; the same cursor works for both.
+    """
+    if cursor:
+        try:
+            query = {"$and": [query, decode_cursor(cursor)]}
+        except (ValueError, InvalidId):
+            return json_response({"detail": "Invalid cursor"}, status_code=400)
+
+    def find(collection, batch_size: int):
+        found = collection.find(query, projection).sort(SORT_ORDER)
+        return found.batch_size(batch_size) if format == "ndjson" else found.limit(batch_size)
+
+    # A page never needs more than limit + 1 documents from either store
+    batch_size = 500 if format == "ndjson" else limit + 1
+    if archive is None:
+        docs = find(collection, batch_size)
+    else:
+        docs = merge_newest_first(find(collection, batch_size), find(archive, batch_size))
+
+    if format == "ndjson":
+        async def stream():
+            async for doc in docs:
+                yield dumps(doc) + b"\n"
+        return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+    docs = [doc async for doc in docs][:limit + 1]
+    has_more = len(docs) > limit
+    docs = docs[:limit]
+
+    return json_response({
+        "items": docs,
+        "next_cursor": encode_cursor(docs[-1]) if has_more else None
+    })
+
+@router.get("/submissions")
+async def list_submissions(
+    is_admin: bool = Depends(get_current_admin),
+    date: Optional[str] = Query(None),
+    search: Optional[str] = Query(None),
+    view: str = Query("active"),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(100, ge=1, le=1000),
+    format: str = Query("json", pattern="^(json|ndjson)$")
+):
+    if not is_admin:
+        return json_response({"detail": "Not authenticated"}, status_code=401)
+
+    # Same filters as the dashboard: view, then search OR date
+    criteria = [{"deleted_at": {"$ne": None}} if view == "trash" else {"deleted_at": None}]
+
+    collection, archived = Submission.get_pymongo_collection(), None
+
+    if search:
+        criteria.append({"email": {"$regex": f"^{re.escape(search)}", "$options": "i"}})
+        # Like the dashboard, a search covers every day, archived ones included
+        archived = reporting(archive.archive_collection())
+    else:
+        target_date = resolve_ist_date(date)
+        criteria.append({"date_str": target_date.strftime("%Y-%m-%d")})
+        # Days the archive job has moved are read from both stores, like the dashboard
+        if await archive.is_archived_date(target_date):
+            archived = reporting(archive.archive_collection())
+
+    return await paginate(reporting(collection), {"$and": criteria}, SUBMISSION_FIELDS, limit, cursor, format, archived)
+
+@router.get("/logs")
+async def list_logs(
+    is_admin: bool = Depends(get_current_admin),
+    filter: Optional[str] = Query(None),
+    level: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(100, ge=1, le=1000),
+    format: str = Query("json", pattern="^(json|ndjson)$")
+):
+    if not is_admin:
+        return json_response({"detail": "Not authenticated"}, status_code=401)
+
+    return await paginate(reporting(AdminLog.get_pymongo_collection()), build_log_filter(filter, level), LOG_FIELDS, limit, cursor, format)
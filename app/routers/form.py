@@ -1,6 +1,5 @@
 
 from fastapi import APIRouter, Request, Form, Query, BackgroundTasks
-from fastapi.templating import Jinja2Templates
 from fastapi.responses import HTMLResponse, RedirectResponse
 import re
 from datetime import datetime
@@ -8,10 +7,12 @@ from typing import List, Optional
 from beanie import PydanticObjectId
 from app.models import Submission, Slot
 from app.config import settings
+from app.templating import templates, cached_page_response
+from app.utils.dates import IST
 from app.services.email_service import send_acknowledgement_email
+from app.services import live_updates, idempotency, capacity, digest
 
 router = APIRouter()
-templates = Jinja2Templates(directory="templates")
 
 @router.get("/", response_class=HTMLResponse)
 async def read_form(
@@ -23,6 +24,10 @@ async def read_form(
     email: Optional[str] = None,
     selected_slots: Optional[List[str]] = Query(None)
 ):
+    # The bare form is identical for every visitor, so serve it from the render cache
+    if not request.query_params:
+        return cached_page_response(request, "index.html")
+
     context = {
         "request": request, 
         "error": error,
@@ -48,7 +53,7 @@ async def read_form(
 
 @router.get("/submitted/{id}", response_class=HTMLResponse)
 async def read_submitted(request: Request, id: PydanticObjectId):
-    return templates.TemplateResponse("submitted.html", {"request": request, "submission_id": str(id)})
+    return cached_page_response(request, "submitted.html", {"submission_id": str(id)})
 
 @router.post("/", response_class=HTMLResponse)
 async def submit_form(
@@ -56,9 +61,30 @@ async def submit_form(
     background_tasks: BackgroundTasks,
     reg_no: str = Form(""), 
     email: str = Form(""),
-    selected_slots: List[str] = Form([])
+    selected_slots: List[str] = Form([]),
+    idempotency_key: Optional[str] = Form(None)
 ):
+    # Retried submits (double taps, slow connections) replay the original redirect with no DB work
+    idempotency_key = idempotency.normalize_key(idempotency_key)
+    if idempotency_key:
+        original_redirect = await idempotency.store.replay(idempotency_key)
+        if original_redirect:
+            return RedirectResponse(url=original_redirect, status_code=303)
+        idempotency.store.begin(idempotency_key)
+
+    async def replay_persisted():
+        # Retry that reached another instance: only checked once the duplicate guard fires
+        if idempotency_key:
+            original_redirect = await idempotency.store.recall(idempotency_key)
+            if original_redirect:
+                idempotency.store.complete(idempotency_key, original_redirect)
+                return RedirectResponse(url=original_redirect, status_code=303)
+        return None
+
     def redirect_with_error(msg, passed_reg_no=reg_no, passed_email=email, is_email_error=False, is_reg_no_error=False):
+        if idempotency_key:
+            idempotency.store.abandon(idempotency_key)
+
         import urllib.parse
         if is_email_error:
             params = {"email_error": msg}
@@ -94,10 +120,7 @@ async def submit_form(
         if not re.match(reg_pattern, reg_no):
             return redirect_with_error("Invalid format. Example: 23BAI10056", reg_no, is_reg_no_error=True)
 
-        from datetime import timezone, timedelta
-        IST = timezone(timedelta(hours=5, minutes=30))
-        now_ist = datetime.now(IST)
-        date_str = now_ist.strftime("%Y-%m-%d")
+        date_str = datetime.now(IST).strftime("%Y-%m-%d")
         
         # Check for duplicate using the persistent field
         # Note: We rely on the Unique Index for race condition, but this check provides a friendly error for normal users
@@ -107,6 +130,9 @@ async def submit_form(
         )
         
         if duplicate:
+            replay = await replay_persisted()
+            if replay:
+                return replay
             return redirect_with_error("This registration number has already submitted today. Please check your email for the edit link.", reg_no)
 
         if not email:
@@ -121,20 +147,31 @@ async def submit_form(
         if not email_prefix.endswith(expected_suffix):
             return redirect_with_error("Email doesn't match the registration number", is_email_error=True)
             
+        now = datetime.utcnow()
         submission_data = {
             "reg_no": reg_no,
             "slots": selected_slots,
             "email": email,
-            "date_str": date_str
+            "date_str": date_str,
+            "created_at": now,
+            "updated_at": now
         }
             
         submission = Submission(**submission_data)
+        slot_capacities = {s.time: s.capacity for s in active_slots_docs}
         
         try:
-            await submission.insert()
+            # Seats are taken before the insert and handed back if it fails
+            async with capacity.rebook([], selected_slots, date_str, slot_capacities):
+                await submission.insert()
+        except capacity.SlotFullError as e:
+            return redirect_with_error(f"Slot {e.slot} is full. Please choose another slot.", reg_no)
         except Exception as e:
             # Catch duplicate key error from Unique Index
             if "DuplicateKey" in str(e) or "E11000" in str(e): 
+                 replay = await replay_persisted()
+                 if replay:
+                     return replay
                  return redirect_with_error("This registration number has already submitted today. Please check your email for the edit link.", reg_no)
             raise e
         
@@ -144,7 +181,16 @@ async def submit_form(
             edit_link = f"{base_url}/edit/{str(submission.id)}"
             background_tasks.add_task(send_acknowledgement_email, email, reg_no, selected_slots, edit_link)
 
-        return RedirectResponse(url=f"/submitted/{submission.id}", status_code=303)
+        redirect_url = f"/submitted/{submission.id}"
+        if idempotency_key:
+            idempotency.store.complete(idempotency_key, redirect_url)
+            background_tasks.add_task(idempotency.store.persist, idempotency_key, redirect_url)
+
+        # A digest that already ran for today must not be served without this sign-up.
+        # After the response: the sign-up is stored, so a failure here must not turn it into an error
+        background_tasks.add_task(digest.invalidate_in_background, date_str)
+
+        return RedirectResponse(url=redirect_url, status_code=303)
 
     except Exception as e:
         print(f"Internal Error: {e}")
@@ -224,11 +270,24 @@ async def user_update_submission(
         # No changes made - redirect with no_change flag
         return RedirectResponse(url=f"/edit/{id}?no_change=1", status_code=303)
 
-    # Update fields
+    # Update fields, moving seats between the old and new slots around the save
+    slot_capacities = {s.time: s.capacity for s in active_slots_docs}
+    # Also conditional on the edit count, so a concurrent edit can't slip past the limit
+    state = {**capacity.rebooked_state(submission), "edit_count": submission.edit_count}
+    try:
+        async with capacity.rebook_submission(submission, selected_slots, slot_capacities):
+            await capacity.update_rebooked(state, {"$set": {"email": email, "slots": selected_slots}, "$inc": {"edit_count": 1}})
+    except capacity.SlotFullError as e:
+        import urllib.parse
+        error_msg = urllib.parse.quote(f"Slot {e.slot} is full. Please choose another slot.")
+        return RedirectResponse(url=f"/edit/{id}?error={error_msg}", status_code=303)
+    except capacity.SubmissionChangedError:
+        return RedirectResponse(url=f"/edit/{id}?error=Your+submission+was+changed+meanwhile.+Please+check+it+and+try+again.", status_code=303)
     submission.email = email
     submission.slots = selected_slots
     submission.edit_count += 1
-    await submission.save()
+    live_updates.broker.publish(live_updates.document_event("updated", submission), local=True)
+    await digest.invalidate(capacity.submission_day(submission))
     
     if submission.email:
         from app.services.email_service import send_update_email
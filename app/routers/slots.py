@@ -1,21 +1,27 @@
 
 from fastapi import APIRouter, Depends, Form
 from fastapi.responses import JSONResponse, HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
 from fastapi import Request
 from beanie import PydanticObjectId
+from datetime import datetime
+from typing import Optional
 
 from app.models import Slot
 from app.dependencies import get_current_admin
+from app.templating import templates
+from app.services import digest
+from app.services.capacity import remaining_seats
+from app.utils.dates import IST
 
 router = APIRouter()
-templates = Jinja2Templates(directory="templates")
 
 # Public API - Get all active slots
 @router.get("/api/slots")
 async def get_slots():
     slots = await Slot.find(Slot.is_active == True).to_list()
-    return [{"id": str(s.id), "time": s.time} for s in slots]
+    # Remaining seats come from the same counters that enforce the capacity
+    remaining = await remaining_seats(slots, datetime.now(IST).strftime("%Y-%m-%d"))
+    return [{"id": str(s.id), "time": s.time, "capacity": s.capacity, "remaining": remaining[s.time]} for s in slots]
 
 # Admin Pages
 @router.get("/admin/slots", response_class=HTMLResponse)
@@ -24,10 +30,20 @@ async def manage_slots_page(request: Request, is_admin: bool = Depends(get_curre
         return RedirectResponse(url="/admin/login")
     
     slots = await Slot.find_all().to_list()
-    return templates.TemplateResponse("manage_slots.html", {"request": request, "slots": slots})
+    remaining = await remaining_seats(slots, datetime.now(IST).strftime("%Y-%m-%d"))
+    return templates.TemplateResponse("manage_slots.html", {"request": request, "slots": slots, "remaining": remaining})
+
+def parse_capacity(value: Optional[str]) -> Optional[int]:
+    """Blank means unlimited; anything else must be a non-negative whole number"""
+    value = (value or "").strip()
+    if not value:
+        return None
+    if not value.isdigit():
+        raise ValueError(value)
+    return int(value)
 
 @router.post("/admin/slots")
-async def add_slot(time: str = Form(...), is_admin: bool = Depends(get_current_admin)):
+async def add_slot(time: str = Form(...), capacity: Optional[str] = Form(None), is_admin: bool = Depends(get_current_admin)):
     if not is_admin:
         return RedirectResponse(url="/admin/login")
     
@@ -37,8 +53,31 @@ async def add_slot(time: str = Form(...), is_admin: bool = Depends(get_current_a
         # Slot already exists - just redirect back
         return RedirectResponse(url="/admin/slots?error=exists", status_code=303)
     
-    new_slot = Slot(time=time)
+    try:
+        slot_capacity = parse_capacity(capacity)
+    except ValueError:
+        return RedirectResponse(url="/admin/slots?error=capacity", status_code=303)
+    
+    new_slot = Slot(time=time, capacity=slot_capacity)
     await new_slot.insert()
+    await digest.invalidate_all()  # New slots are active, so every workbook gains a column
+    return RedirectResponse(url="/admin/slots", status_code=303)
+
+@router.post("/admin/slots/capacity/{id}")
+async def update_slot_capacity(id: PydanticObjectId, capacity: Optional[str] = Form(None), is_admin: bool = Depends(get_current_admin)):
+    if not is_admin:
+        return RedirectResponse(url="/admin/login")
+    
+    try:
+        slot_capacity = parse_capacity(capacity)
+    except ValueError:
+        return RedirectResponse(url="/admin/slots?error=capacity", status_code=303)
+    
+    # Lowering the capacity below the seats already taken only blocks new sign-ups
+    slot = await Slot.get(id)
+    if slot:
+        slot.capacity = slot_capacity
+        await slot.save()
     return RedirectResponse(url="/admin/slots", status_code=303)
 
 @router.post("/admin/slots/delete/{id}")
@@ -49,6 +88,7 @@ async def delete_slot(id: PydanticObjectId, is_admin: bool = Depends(get_current
     slot = await Slot.get(id)
     if slot:
         await slot.delete()
+        await digest.invalidate_all()
     return RedirectResponse(url="/admin/slots", status_code=303)
 
 @router.post("/admin/slots/toggle/{id}")
@@ -60,4 +100,5 @@ async def toggle_slot(id: PydanticObjectId, is_admin: bool = Depends(get_current
     if slot:
         slot.is_active = not slot.is_active
         await slot.save()
+        await digest.invalidate_all()
     return RedirectResponse(url="/admin/slots", status_code=303)
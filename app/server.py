@@ -0,0 +1,96 @@
+"""
+Production launcher (the Vercel deployment doesn't use this; `python main.py` stays the dev server).
+
+    python -m app.server
+
+Everything is driven by the SERVER_* settings in app/config.py. uvloop and httptools
+are used when installed. With SERVER_PRELOAD the app is imported once in a gunicorn
+master and forked into uvicorn workers; otherwise uvicorn's own supervisor spawns
+workers that each import the app.
+
+On SIGTERM workers stop accepting connections and get SERVER_GRACEFUL_TIMEOUT seconds
+to finish in-flight requests, including their background tasks (acknowledgement
+emails, idempotency writes). Open dashboard event streams are cut at the timeout and
+reconnect to whichever worker is still up.
+"""
+import importlib.util
+import os
+
+from app.config import settings
+
+APP_PATH = "main:app"
+
+
+def resolve_loop() -> str:
+    if settings.SERVER_LOOP != "auto":
+        return settings.SERVER_LOOP
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+
+def resolve_http() -> str:
+    if settings.SERVER_HTTP != "auto":
+        return settings.SERVER_HTTP
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+
+def worker_count() -> int:
+    return settings.SERVER_WORKERS or os.cpu_count() or 1
+
+
+def run_uvicorn():
+    import uvicorn
+
+    uvicorn.run(
+        APP_PATH,
+        host=settings.SERVER_HOST,
+        port=settings.SERVER_PORT,
+        workers=worker_count(),
+        loop=resolve_loop(),
+        http=resolve_http(),
+        timeout_keep_alive=settings.SERVER_KEEP_ALIVE,
+        backlog=settings.SERVER_BACKLOG,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_TIMEOUT,
+    )
+
+
+def run_preloaded():
+    from gunicorn.app.base import BaseApplication
+    from uvicorn_worker import UvicornWorker
+
+    class Worker(UvicornWorker):
+        # Leave a little of gunicorn's graceful window for lifespan shutdown before it SIGKILLs
+        CONFIG_KWARGS = {
+            "loop": resolve_loop(),
+            "http": resolve_http(),
+            "timeout_graceful_shutdown": max(settings.SERVER_GRACEFUL_TIMEOUT - 2, 1),
+        }
+
+    class Application(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", f"{settings.SERVER_HOST}:{settings.SERVER_PORT}")
+            self.cfg.set("workers", worker_count())
+            self.cfg.set("worker_class", Worker)
+            self.cfg.set("keepalive", settings.SERVER_KEEP_ALIVE)
+            self.cfg.set("backlog", settings.SERVER_BACKLOG)
+            self.cfg.set("graceful_timeout", settings.SERVER_GRACEFUL_TIMEOUT)
+            self.cfg.set("preload_app", True)
+
+        def load(self):
+            from main import app
+            return app
+
+    Application().run()
+
+
+def run():
+    print(f"[Server] {worker_count()} worker(s) on {settings.SERVER_HOST}:{settings.SERVER_PORT} "
+          f"(loop={resolve_loop()}, http={resolve_http()}, preload={settings.SERVER_PRELOAD})")
+
+    if settings.SERVER_PRELOAD:
+        run_preloaded()
+    else:
+        run_uvicorn()
+
+
+if __name__ == "__main__":
+    run()
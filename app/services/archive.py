@@ -0,0 +1,188 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import CollectionInvalid
+
+from app.config import settings
+from app.database import routed
+from app.models import ArchiveState, Submission
+from app.utils.dates import IST, utc_day_bounds
+
+# Same lookups as the hot collection, so archived days are still served from indexes
+ARCHIVE_INDEXES = [
+    IndexModel([("date_str", ASCENDING), ("deleted_at", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+    IndexModel([("deleted_at", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+    IndexModel([("reg_no", ASCENDING), ("date_str", ASCENDING)]),
+    IndexModel([("email", ASCENDING)]),
+]
+
+
+def archive_collection():
+    return Submission.get_pymongo_collection().database[settings.ARCHIVE_COLLECTION]
+
+
+def archive_cutoff() -> datetime:
+    """Start of the first IST day that stays hot"""
+    return (datetime.now(IST) - timedelta(days=settings.ARCHIVE_AFTER_DAYS)).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+class StateCache:
+    """
+    The cutoff the archive job actually applied (ArchiveState.archived_before), re-read
+    at most every ARCHIVE_STATE_TTL seconds per worker. Reads route on this rather than
+    on ARCHIVE_AFTER_DAYS, so days the job has not moved yet are still read from the
+    hot collection.
+    """
+
+    def __init__(self, ttl: float = settings.ARCHIVE_STATE_TTL):
+        self.ttl = ttl
+        self._archived_before: Optional[str] = None
+        self._loaded_at: Optional[float] = None
+
+    async def archived_before(self) -> Optional[str]:
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl:
+            state = await ArchiveState.find_one()
+            self._archived_before = state.archived_before if state else None
+            self._loaded_at = time.monotonic()
+        return self._archived_before
+
+    def invalidate(self):
+        self._loaded_at = None
+
+
+state_cache = StateCache()
+
+
+async def is_archived_date(target_date: datetime) -> bool:
+    archived_before = await state_cache.archived_before()
+    return archived_before is not None and target_date.strftime("%Y-%m-%d") < archived_before
+
+
+async def record_cutoff(archived_before: str):
+    """Move the recorded cutoff forward (never back: those days are no longer hot)"""
+    await ArchiveState.get_pymongo_collection().update_one(
+        {},
+        {"$max": {"archived_before": archived_before}, "$set": {"updated_at": datetime.utcnow()}},
+        upsert=True
+    )
+    state_cache.invalidate()
+
+
+async def ensure_archive_collection():
+    """Create the archive with zstd block compression (cold data is read rarely) and its indexes"""
+    database = Submission.get_pymongo_collection().database
+    try:
+        await database.create_collection(
+            settings.ARCHIVE_COLLECTION,
+            storageEngine={"wiredTiger": {"configString": "block_compressor=zstd"}}
+        )
+    except CollectionInvalid:
+        pass  # Already exists
+    await archive_collection().create_indexes(ARCHIVE_INDEXES)
+
+
+async def archive_old_submissions(batch_size: Optional[int] = None, wait: Optional[float] = None) -> int:
+    """
+    Move submissions from days older than ARCHIVE_AFTER_DAYS into the archive collection.
+
+    The cutoff is recorded first, and only after `wait` seconds (ARCHIVE_STATE_TTL, so
+    every worker's cached cutoff has caught up and reads those days from both stores)
+    are documents moved. Each batch is upserted into the archive as it is now, then
+    deleted from the hot collection only where it still matches that copy exactly: a
+    document edited in between stays hot and is moved by the next run, and the copy of
+    one deleted in between is removed again. An interrupted run can simply be re-run,
+    since the upserts overwrite older copies.
+    """
+    batch_size = batch_size or settings.ARCHIVE_BATCH_SIZE
+    wait = settings.ARCHIVE_STATE_TTL if wait is None else wait
+    cutoff = archive_cutoff()
+    cutoff_utc, _ = utc_day_bounds(cutoff)
+    old = {"created_at": {"$lt": cutoff_utc}}
+    hot, cold = Submission.get_pymongo_collection(), archive_collection()
+
+    await ensure_archive_collection()
+
+    await record_cutoff(cutoff.strftime("%Y-%m-%d"))
+    if await hot.find_one(old, {"_id": 1}):
+        print(f"[Archive] Cutoff recorded, waiting {wait}s for workers to pick it up")
+        await asyncio.sleep(wait)
+
+    moved, changed, last_id = 0, 0, None
+    while True:
+        query = {**old, "_id": {"$gt": last_id}} if last_id else old
+        batch = await hot.find(query).sort("_id", ASCENDING).limit(batch_size).to_list(length=batch_size)
+        if not batch:
+            break
+
+        await asyncio.gather(*(cold.replace_one({"_id": doc["_id"]}, doc, upsert=True) for doc in batch))
+        # Matching on every field skips documents changed since they were read
+        results = await asyncio.gather(*(hot.delete_one(doc) for doc in batch))
+        missed = [doc["_id"] for doc, result in zip(batch, results) if not result.deleted_count]
+        if missed:
+            # Edited ones stay hot (readers prefer the hot copy); deleted ones must not live on in the archive
+            still_hot = {doc["_id"] for doc in await hot.find({"_id": {"$in": missed}}, {"_id": 1}).to_list(length=None)}
+            gone = [_id for _id in missed if _id not in still_hot]
+            if gone:
+                await cold.delete_many({"_id": {"$in": gone}})
+            changed += len(still_hot)
+
+        last_id = batch[-1]["_id"]
+        moved += len(batch) - len(missed)
+        print(f"[Archive] Moved {moved} submissions older than {cutoff_utc} UTC")
+
+    if changed:
+        print(f"[Archive] {changed} submissions changed while being moved; the next run moves them")
+    return moved
+
+
+async def find_submission_docs(query: dict, target_date: Optional[datetime] = None, projection: Optional[dict] = None,
+                               sort: Optional[list] = None, codec_options=None, read_preference=None) -> List[dict]:
+    """
+    Run a raw submissions query against the hot collection, adding the archive when the
+    requested day has been archived (or no day was given, e.g. a search).
+
+    Archived days query both stores concurrently, so results stay complete while an
+    archive run is still catching up. Documents read from the archive carry
+    "archived": True, since they can only be viewed, not edited.
+    """
+    def find(collection):
+        if codec_options is not None or read_preference is not None:
+            collection = routed(collection, read_preference, codec_options)
+        cursor = collection.find(query, dict(projection) if projection else None)
+        if sort:
+            cursor = cursor.sort(sort)
+        return cursor.to_list(length=None)
+
+    hot = Submission.get_pymongo_collection()
+    if target_date is not None and not await is_archived_date(target_date):
+        return await find(hot)
+
+    hot_docs, cold_docs = await asyncio.gather(find(hot), find(archive_collection()))
+
+    # A document mid-move can briefly exist in both stores
+    hot_ids = {doc["_id"] for doc in hot_docs}
+    docs = hot_docs + [{**doc, "archived": True} for doc in cold_docs if doc["_id"] not in hot_ids]
+
+    if sort and cold_docs:
+        for field, direction in reversed(sort):
+            docs.sort(key=lambda doc: doc[field], reverse=direction < 0)
+    return docs
+
+
+if __name__ == "__main__":
+    import argparse
+    from app.database import init_db
+
+    parser = argparse.ArgumentParser(description="Move old submissions into the archive collection")
+    parser.add_argument("--batch-size", type=int, default=settings.ARCHIVE_BATCH_SIZE)
+    args = parser.parse_args()
+
+    async def run():
+        await init_db()
+        moved = await archive_old_submissions(args.batch_size)
+        print(f"[Archive] Done, {moved} submissions archived")
+
+    asyncio.run(run())
@@ -0,0 +1,69 @@
+"""
+Backfill Submission.date_str on legacy documents so day filters can use an indexed
+equality match instead of created_at range scans.
+
+    python -m app.services.backfill            # backfill hot + archive collections
+    python -m app.services.backfill --check    # only report documents still missing date_str
+
+Safe to interrupt and re-run: each pass only picks up documents whose date_str is
+still missing, and updates are conditional on that too.
+"""
+import argparse
+import asyncio
+
+from pymongo import UpdateOne
+
+from app.models import Submission
+from app.services.archive import archive_collection
+from app.utils.dates import ist_date_str
+
+MISSING_DATE_STR = {"date_str": None}  # Matches both null and absent fields
+
+
+async def missing_count(collection) -> int:
+    return await collection.count_documents(MISSING_DATE_STR)
+
+
+async def backfill_date_str(collection, batch_size: int = 1000) -> int:
+    updated = 0
+    last_id = None
+
+    while True:
+        query = dict(MISSING_DATE_STR)
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+
+        batch = await collection.find(query, {"created_at": 1}).sort("_id", 1).limit(batch_size).to_list(length=batch_size)
+        if not batch:
+            break
+
+        operations = [
+            UpdateOne({"_id": doc["_id"], **MISSING_DATE_STR}, {"$set": {"date_str": ist_date_str(doc["created_at"])}})
+            for doc in batch if doc.get("created_at")
+        ]
+        if operations:
+            result = await collection.bulk_write(operations, ordered=False)
+            updated += result.modified_count
+
+        last_id = batch[-1]["_id"]
+        print(f"[Backfill] {collection.name}: {updated} documents updated")
+
+    return updated
+
+
+if __name__ == "__main__":
+    from app.database import init_db
+
+    parser = argparse.ArgumentParser(description="Backfill date_str on legacy submissions")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--check", action="store_true", help="Only report how many documents are missing date_str")
+    args = parser.parse_args()
+
+    async def run():
+        await init_db()
+        for collection in (Submission.get_pymongo_collection(), archive_collection()):
+            if not args.check:
+                await backfill_date_str(collection, args.batch_size)
+            print(f"[Backfill] {collection.name}: {await missing_count(collection)} documents missing date_str")
+
+    asyncio.run(run())
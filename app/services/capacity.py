@@ -0,0 +1,183 @@
+"""
+Per-slot capacity, enforced with one counter document per (slot, date_str).
+
+A seat is taken with a single conditional update: filter on {"taken": {"$lt": capacity}}
+and $inc it, upserting so the first sign-up of the day creates the counter.
+When the slot is full the filter misses, the upsert tries to insert a second counter
+for the same key and the unique index rejects it. Each request touches only the
+counters of the slots it changes, and nothing ever reads a count and writes it back.
+
+    python -m app.services.capacity --recount 2026-03-14   # rebuild a day's counters from submissions
+"""
+import argparse
+import asyncio
+from contextlib import asynccontextmanager, nullcontext
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from pymongo.errors import DuplicateKeyError
+
+from app.models import Slot, SlotCounter, Submission
+from app.utils.dates import ist_date_str
+
+
+class SlotFullError(Exception):
+    def __init__(self, slot: str):
+        self.slot = slot
+        super().__init__(f"Slot {slot} is full")
+
+
+def counters():
+    return SlotCounter.get_pymongo_collection()
+
+
+def submission_day(submission: Submission) -> str:
+    """Counter day of a submission (legacy documents may predate date_str)"""
+    return submission.date_str or ist_date_str(submission.created_at)
+
+
+async def slot_capacities(times: Iterable[str]) -> Dict[str, Optional[int]]:
+    slots = await Slot.get_pymongo_collection().find({"time": {"$in": list(times)}}, {"time": 1, "capacity": 1}).to_list(length=None)
+    return {s["time"]: s.get("capacity") for s in slots}
+
+
+async def take_seat(slot: str, date_str: str, capacity: Optional[int]) -> bool:
+    if capacity is not None and capacity <= 0:
+        return False
+
+    query = {"slot": slot, "date_str": date_str}
+    if capacity is not None:
+        query["taken"] = {"$lt": capacity}
+
+    # Two first sign-ups of the day can race to create the counter; the loser retries
+    # once the counter exists, and a second rejection means the slot really is full
+    for _ in range(2):
+        try:
+            await counters().update_one(query, {"$inc": {"taken": 1}}, upsert=True)
+            return True
+        except DuplicateKeyError:
+            continue
+    return False
+
+
+async def release_seat(slot: str, date_str: str):
+    await counters().update_one(
+        {"slot": slot, "date_str": date_str, "taken": {"$gt": 0}},
+        {"$inc": {"taken": -1}}
+    )
+
+
+async def reserve(slots: List[str], date_str: str, capacities: Dict[str, Optional[int]]):
+    """Take a seat in every slot or in none: seats already taken are given back if one is full"""
+    taken = []
+    for slot in slots:
+        if not await take_seat(slot, date_str, capacities.get(slot)):
+            await release(taken, date_str)
+            raise SlotFullError(slot)
+        taken.append(slot)
+
+
+async def release(slots: List[str], date_str: str):
+    await asyncio.gather(*(release_seat(slot, date_str) for slot in slots))
+
+
+@asynccontextmanager
+async def rebook(old_slots: List[str], new_slots: List[str], date_str: str, capacities: Dict[str, Optional[int]]):
+    """
+    Move a submission from old_slots to new_slots around the write in the with-block.
+
+    Newly added slots are reserved up front (raising SlotFullError if any is full).
+    If the write fails they are released again; once it succeeds the dropped slots
+    are released, so a failed edit never gives up a seat the submission still holds.
+    """
+    added = [s for s in dict.fromkeys(new_slots) if s not in old_slots]
+    removed = [s for s in dict.fromkeys(old_slots) if s not in new_slots]
+
+    await reserve(added, date_str, capacities)
+    try:
+        yield
+    except BaseException:
+        await release(added, date_str)
+        raise
+    await release(removed, date_str)
+
+
+def rebook_submission(submission: Submission, new_slots: List[str], capacities: Dict[str, Optional[int]]):
+    """rebook() for an existing submission, called before its slots are changed; trashed ones hold no seats"""
+    if submission.deleted_at is not None:
+        return nullcontext()
+    return rebook(list(submission.slots), new_slots, submission_day(submission), capacities)
+
+
+class SubmissionChangedError(Exception):
+    """Another request changed the submission between reading and writing it"""
+
+
+def rebooked_state(submission: Submission) -> dict:
+    """
+    Filter matching the submission only while it is still in the state its seats were
+    rebooked from. Writes inside rebook() go through it, so when two copies of the same
+    edit or delete race (a double tap) only one lands and the other gives its seats back.
+    """
+    return {"_id": submission.id, "slots": list(submission.slots), "deleted_at": submission.deleted_at}
+
+
+async def update_rebooked(state: dict, update: dict):
+    """Apply the update (stamping updated_at) if the submission still matches state, else raise SubmissionChangedError"""
+    update = {**update, "$set": {**update.get("$set", {}), "updated_at": datetime.utcnow()}}
+    result = await Submission.get_pymongo_collection().update_one(state, update)
+    if result.matched_count == 0:
+        raise SubmissionChangedError()
+
+
+async def delete_rebooked(state: dict):
+    result = await Submission.get_pymongo_collection().delete_one(state)
+    if result.deleted_count == 0:
+        raise SubmissionChangedError()
+
+
+async def remaining_seats(slots: List[Slot], date_str: str) -> Dict[str, Optional[int]]:
+    """Seats left per slot time for the day (None for unlimited slots)"""
+    remaining = {s.time: None for s in slots}
+    capped = {s.time: s.capacity for s in slots if s.capacity is not None}
+    if not capped:
+        return remaining
+
+    cursor = counters().find({"slot": {"$in": list(capped)}, "date_str": date_str}, {"slot": 1, "taken": 1})
+    counts = {c["slot"]: c["taken"] async for c in cursor}
+    for time, capacity in capped.items():
+        remaining[time] = max(capacity - counts.get(time, 0), 0)
+    return remaining
+
+
+async def recount(date_str: str) -> Dict[str, int]:
+    """
+    Rebuild a day's counters from its live submissions, e.g. after capacities are first
+    enabled mid-day. Not atomic with concurrent sign-ups, so run it off-peak.
+    """
+    pipeline = [
+        {"$match": {"date_str": date_str, "deleted_at": None}},
+        {"$unwind": "$slots"},
+        {"$group": {"_id": "$slots", "count": {"$sum": 1}}},
+    ]
+    totals = {row["_id"]: row["count"] async for row in Submission.get_pymongo_collection().aggregate(pipeline)}
+
+    await counters().delete_many({"date_str": date_str, "slot": {"$nin": list(totals)}})
+    for slot, count in totals.items():
+        await counters().update_one({"slot": slot, "date_str": date_str}, {"$set": {"taken": count}}, upsert=True)
+    return totals
+
+
+if __name__ == "__main__":
+    from app.database import init_db
+
+    parser = argparse.ArgumentParser(description="Rebuild slot counters from submissions")
+    parser.add_argument("--recount", metavar="YYYY-MM-DD", required=True)
+    args = parser.parse_args()
+
+    async def run():
+        await init_db()
+        for slot, count in (await recount(args.recount)).items():
+            print(f"[Capacity] {args.recount} {slot}: {count}")
+
+    asyncio.run(run())
@@ -0,0 +1,243 @@
+"""
+Daily digest: once the form has closed, build the day's workbook, store it in
+daily_exports and email it to the organizers with per-slot headcounts.
+
+The scheduler runs inside the app and is started from the lifespan when DIGEST_ENABLED.
+Every worker runs one, but only the worker holding the claim on the day's daily_exports
+document does the work, so the digest is built and sent once. Claims expire after
+DIGEST_CLAIM_TIMEOUT and failed runs are retried every DIGEST_RETRY_INTERVAL, so a
+crash or a failed email does not lose the day.
+
+Serverless deployments have no long-lived process; trigger the CLI from a cron job
+there instead:
+
+    python -m app.services.digest 2026-03-14             # build, store and email one day
+    EMAIL_TRANSPORT=outbox python -m app.services.digest  # dry run for today, nothing is sent
+"""
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+from typing import Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.models import DailyExport
+from app.services import reads
+from app.services.email_service import default_transport, send_digest_email
+from app.services.excel_service import generate_excel_bytes
+from app.utils.dates import IST, resolve_ist_date
+
+
+def export_filename(target_date: datetime) -> str:
+    return f"kabaddi_{target_date.day}_{target_date.month}_{target_date.year}.xlsx"
+
+
+def digest_recipients() -> list:
+    return [r.strip() for r in settings.DIGEST_RECIPIENTS.split(",") if r.strip()]
+
+
+async def build_export(target_date: datetime):
+    """Build the day's workbook; returns (xlsx bytes, per-slot headcounts, total submissions)"""
+    submissions, slot_times = await reads.export_rows(target_date)
+    headcounts = {slot: sum(slot in sub["slots"] for sub in submissions) for slot in slot_times}
+
+    # Pandas/openpyxl are synchronous, keep them off the event loop
+    output = await run_in_threadpool(generate_excel_bytes, submissions, slot_times, target_date)
+    return output.getvalue(), headcounts, len(submissions)
+
+
+async def stored_export(date_str: str) -> Optional[DailyExport]:
+    """The digest's workbook for the day, if it was built and nothing changed since"""
+    export = await DailyExport.find_one(DailyExport.date_str == date_str)
+    if export and export.content and not export.stale:
+        return export
+    return None
+
+
+async def invalidate(*date_strs: str):
+    """
+    Called after a submission changes so downloads stop serving the stored workbook.
+    Bumping the version also catches a build that is running right now (see run_digest).
+    """
+    await DailyExport.get_pymongo_collection().update_many(
+        {"date_str": {"$in": list(date_strs)}},
+        {"$set": {"stale": True}, "$inc": {"version": 1}}
+    )
+
+
+async def invalidate_in_background(*date_strs: str):
+    """invalidate() for background tasks, where an error would only end up in the server log"""
+    try:
+        await invalidate(*date_strs)
+    except Exception as e:
+        print(f"[Digest] Could not invalidate the stored export for {', '.join(date_strs)}: {e}")
+
+
+async def invalidate_all():
+    """Called after the active slots change, which changes every workbook's columns"""
+    await DailyExport.get_pymongo_collection().update_many({}, {"$set": {"stale": True}, "$inc": {"version": 1}})
+
+
+async def claim(date_str: str, force: bool = False) -> Optional[dict]:
+    """
+    Take the day's job: the daily_exports document, or None if the job is done or another
+    worker's claim is younger than DIGEST_CLAIM_TIMEOUT. A worker that died mid-run
+    leaves a claim that simply expires.
+    """
+    now = datetime.utcnow()
+    query = {"date_str": date_str}
+    if not force:
+        query["completed_at"] = None
+        query["$or"] = [
+            {"claimed_at": None},
+            {"claimed_at": {"$lt": now - timedelta(seconds=settings.DIGEST_CLAIM_TIMEOUT)}}
+        ]
+    try:
+        # No matching document: the upsert creates the day's, or hits the unique index if it exists
+        return await DailyExport.get_pymongo_collection().find_one_and_update(
+            query,
+            {"$set": {"claimed_at": now}, "$setOnInsert": {"stale": False, "version": 0, "headcounts": {}, "total": 0}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+    except DuplicateKeyError:
+        return None
+
+
+async def is_complete(date_str: str) -> bool:
+    return await DailyExport.get_pymongo_collection().count_documents(
+        {"date_str": date_str, "completed_at": {"$ne": None}}, limit=1
+    ) > 0
+
+
+async def run_digest(date_str: str, transport=None, force: bool = False) -> bool:
+    """
+    Build, store and email one day's digest. Returns False if it is already done or
+    another worker has it. A failed run releases its claim so the next attempt can retry;
+    a workbook that was stored before the email failed is reused rather than rebuilt.
+    """
+    job = await claim(date_str, force)
+    if job is None:
+        return False
+
+    collection = DailyExport.get_pymongo_collection()
+    try:
+        if force or job.get("stale") or not job.get("content"):
+            target_date = resolve_ist_date(date_str)
+            xlsx, headcounts, total = await build_export(target_date)
+            filename = export_filename(target_date)
+
+            workbook = {
+                "filename": filename,
+                "content": xlsx,
+                "headcounts": headcounts,
+                "total": total,
+                "generated_at": datetime.utcnow()
+            }
+            # Only fresh if nothing was invalidated since the claim; otherwise the workbook
+            # is still emailed, but downloads rebuild it
+            fresh = await collection.update_one(
+                {"date_str": date_str, "version": job.get("version")},
+                {"$set": {**workbook, "stale": False}}
+            )
+            if not fresh.matched_count:
+                await collection.update_one({"date_str": date_str}, {"$set": {**workbook, "stale": True}})
+            print(f"[Digest] Stored {filename} ({total} submissions)")
+        else:
+            xlsx, headcounts, total, filename = job["content"], job["headcounts"], job["total"], job["filename"]
+
+        recipients = digest_recipients()
+        if not recipients:
+            print("[Digest] DIGEST_RECIPIENTS is empty, skipping email")
+        else:
+            sent = await run_in_threadpool(send_digest_email, recipients, date_str, headcounts, total, filename, xlsx, transport)
+            if not sent:
+                raise RuntimeError("digest email was not sent")
+            await collection.update_one({"date_str": date_str}, {"$set": {"emailed_at": datetime.utcnow()}})
+    except Exception:
+        await collection.update_one({"date_str": date_str}, {"$set": {"claimed_at": None}})
+        raise
+
+    await collection.update_one({"date_str": date_str}, {"$set": {"completed_at": datetime.utcnow(), "claimed_at": None}})
+    return True
+
+
+def next_run(now: datetime) -> datetime:
+    """Next DIGEST_TIME (IST) strictly after now"""
+    hour, minute = (int(part) for part in settings.DIGEST_TIME.split(":"))
+    run_at = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    return run_at if run_at > now else run_at + timedelta(days=1)
+
+
+class DigestScheduler:
+    """Sleeps until DIGEST_TIME each day and runs that day's digest"""
+
+    def __init__(self, transport_factory=default_transport):
+        self.transport_factory = transport_factory
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def run_once(self, date_str: str) -> bool:
+        """One attempt; True once the day's digest is done, by this worker or another"""
+        try:
+            await run_digest(date_str, self.transport_factory())
+            return await is_complete(date_str)
+        except Exception as e:
+            print(f"[Digest] Failed for {date_str}: {e}")
+            return False
+
+    async def run_until_complete(self, date_str: str, deadline: datetime):
+        """Retry every DIGEST_RETRY_INTERVAL (failed build or email, expired claim) until the next run is due"""
+        while not await self.run_once(date_str):
+            if datetime.now(IST) + timedelta(seconds=settings.DIGEST_RETRY_INTERVAL) >= deadline:
+                print(f"[Digest] Giving up on {date_str}")
+                return
+            await asyncio.sleep(settings.DIGEST_RETRY_INTERVAL)
+
+    async def _run(self):
+        # Started after today's run time (deploy, restart): catch up; completed days are skipped
+        now = datetime.now(IST)
+        if next_run(now).date() > now.date():
+            await self.run_until_complete(now.strftime("%Y-%m-%d"), next_run(now))
+
+        while True:
+            now = datetime.now(IST)
+            run_at = next_run(now)
+            await asyncio.sleep((run_at - now).total_seconds())
+            await self.run_until_complete(run_at.strftime("%Y-%m-%d"), next_run(run_at))
+
+
+scheduler = DigestScheduler()
+
+
+if __name__ == "__main__":
+    from app.database import init_db
+
+    parser = argparse.ArgumentParser(description="Build, store and email a day's digest")
+    parser.add_argument("date", nargs="?", help="YYYY-MM-DD (IST), defaults to today")
+    args = parser.parse_args()
+
+    async def run():
+        await init_db()
+        date_str = resolve_ist_date(args.date).strftime("%Y-%m-%d")
+        transport = default_transport()
+        await run_digest(date_str, transport, force=True)
+        for message in getattr(transport, "outbox", []):
+            print(f"[Digest] Outbox: {message['subject']} -> {', '.join(message['to'])}")
+
+    asyncio.run(run())
@@ -4,6 +4,8 @@ from app.config import settings
 
 resend.api_key = settings.RESEND_API_KEY
 
+SENDER = "Kabaddi OD Form <no-reply@aymahajan.in>"
+
 def send_acknowledgement_email(email: str, reg_no: str, slots: list[str], edit_link: str):
     if not settings.RESEND_API_KEY:
         print("[Email Service] Resend API Key is MISSING or Empty.")
@@ -19,9 +21,8 @@ def send_acknowledgement_email(email: str, reg_no: str, slots: list[str], edit_l
         <p>You can edit your submission here: <a href="{edit_link}">Edit Submission</a></p>
         """
         
-        # Sender updated to custom domain
         r = resend.Emails.send({
-            "from": "Kabaddi OD Form <no-reply@aymahajan.in>",
+            "from": SENDER,
             "to": email,
             "subject": "On-Duty Slot Submission Received",
             "html": html_content
@@ -50,7 +51,7 @@ def send_update_email(email: str, reg_no: str, slots: list[str], edits_remaining
         """
         
         r = resend.Emails.send({
-            "from": "Kabaddi OD Form <no-reply@aymahajan.in>",
+            "from": SENDER,
             "to": email,
             "subject": "Submission Updated Successfully",
             "html": html_content
@@ -59,3 +60,57 @@ def send_update_email(email: str, reg_no: str, slots: list[str], edits_remaining
         
     except Exception as e:
         print(f"[Email Service] FAILED to send update email: {str(e)}")
+
+class ResendTransport:
+    """Sends through the Resend API (the default)"""
+
+    def send(self, message: dict):
+        return resend.Emails.send(message)
+
+class OutboxTransport:
+    """Keeps messages in memory instead of sending them, for offline runs and tests"""
+
+    def __init__(self):
+        self.outbox = []
+
+    def send(self, message: dict):
+        self.outbox.append(message)
+        return {"id": f"outbox-{len(self.outbox)}"}
+
+def default_transport():
+    return OutboxTransport() if settings.EMAIL_TRANSPORT == "outbox" else ResendTransport()
+
+def send_digest_email(recipients: list[str], date_str: str, headcounts: dict, total: int, filename: str, xlsx: bytes, transport=None):
+    """Daily digest: per-slot headcounts in the body, the day's workbook attached"""
+    transport = transport or default_transport()
+    if isinstance(transport, ResendTransport) and not settings.RESEND_API_KEY:
+        print("[Email Service] Resend API Key is MISSING or Empty.")
+        return None
+
+    print(f"[Email Service] Sending digest for {date_str} to {', '.join(recipients)}...")
+
+    try:
+        rows = "".join(
+            f"<tr><td style=\"padding: 4px 12px;\">{slot}</td><td style=\"padding: 4px 12px; text-align: right;\"><strong>{count}</strong></td></tr>"
+            for slot, count in headcounts.items()
+        )
+        html_content = f"""
+        <h1>Kabaddi OD Digest for {date_str}</h1>
+        <p><strong>{total}</strong> submission(s) today.</p>
+        <table style="border-collapse: collapse; background: #f0f4f8; border-radius: 8px;">{rows}</table>
+        <p style="margin-top: 16px;">The full sheet is attached.</p>
+        """
+
+        r = transport.send({
+            "from": SENDER,
+            "to": recipients,
+            "subject": f"Kabaddi OD Digest - {date_str}",
+            "html": html_content,
+            "attachments": [{"filename": filename, "content": list(xlsx)}]
+        })
+        print(f"[Email Service] Digest Email Response: {r}")
+        return r
+
+    except Exception as e:
+        print(f"[Email Service] FAILED to send digest email: {str(e)}")
+        return None
@@ -0,0 +1,92 @@
+import asyncio
+import re
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from app.config import settings
+from app.models import IdempotencyRecord
+
+KEY_PATTERN = re.compile(r"^[A-Za-z0-9-]{8,64}$")
+
+
+def normalize_key(key: Optional[str]) -> Optional[str]:
+    """Accept only well-formed tokens; anything else is treated as no token"""
+    if key and KEY_PATTERN.match(key):
+        return key
+    return None
+
+
+class IdempotencyStore:
+    """
+    Maps one-time form tokens to the redirect of the request that first used them.
+
+    Lookups are served from an in-memory LRU so retries cost no database work. Keys are
+    also written to a Mongo TTL collection, which is only read when a retry lands on
+    another instance and trips the duplicate check.
+    """
+
+    def __init__(self, max_entries: int, ttl: int):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._completed = OrderedDict()  # key -> (redirect_url, expires_at)
+        self._pending = {}  # key -> Future resolved with the redirect (or None on failure)
+
+    def _remember(self, key: str, redirect_url: str):
+        self._completed[key] = (redirect_url, time.monotonic() + self.ttl)
+        self._completed.move_to_end(key)
+        while len(self._completed) > self.max_entries:
+            self._completed.popitem(last=False)
+
+    async def replay(self, key: str, timeout: float = 10.0) -> Optional[str]:
+        """Redirect for a key already handled (or in flight) in this process, without touching the database"""
+        entry = self._completed.get(key)
+        if entry:
+            redirect_url, expires_at = entry
+            if expires_at > time.monotonic():
+                self._completed.move_to_end(key)
+                return redirect_url
+            del self._completed[key]
+
+        pending = self._pending.get(key)
+        if pending is not None:
+            # Double-tap while the first request is still running: wait for its outcome
+            try:
+                return await asyncio.wait_for(asyncio.shield(pending), timeout)
+            except asyncio.TimeoutError:
+                return None
+        return None
+
+    def begin(self, key: str):
+        self._pending[key] = asyncio.get_running_loop().create_future()
+
+    def complete(self, key: str, redirect_url: str):
+        self._remember(key, redirect_url)
+        pending = self._pending.pop(key, None)
+        if pending is not None and not pending.done():
+            pending.set_result(redirect_url)
+
+    def abandon(self, key: str):
+        """The request failed validation; let waiting retries run normally"""
+        pending = self._pending.pop(key, None)
+        if pending is not None and not pending.done():
+            pending.set_result(None)
+
+    async def recall(self, key: str) -> Optional[str]:
+        """Check the persisted keys (written by any instance)"""
+        record = await IdempotencyRecord.find_one(IdempotencyRecord.key == key)
+        if record:
+            self._remember(key, record.redirect_url)
+            return record.redirect_url
+        return None
+
+    async def persist(self, key: str, redirect_url: str):
+        try:
+            await IdempotencyRecord(key=key, redirect_url=redirect_url).insert()
+        except Exception as e:
+            # A duplicate key just means another request already stored it
+            if "DuplicateKey" not in str(e) and "E11000" not in str(e):
+                print(f"[Idempotency] Failed to persist key: {e}")
+
+
+store = IdempotencyStore(settings.IDEMPOTENCY_CACHE_SIZE, settings.IDEMPOTENCY_TTL)
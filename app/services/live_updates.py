@@ -0,0 +1,246 @@
+import asyncio
+import inspect
+import json
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Optional
+
+from app.config import settings
+from app.models import Submission
+from app.templating import templates
+from app.utils.dates import to_ist
+
+# Only the fields the dashboard rows render, plus the tail poll's position
+SUBMISSION_PROJECTION = {"reg_no": 1, "email": 1, "slots": 1, "created_at": 1, "date_str": 1, "deleted_at": 1, "updated_at": 1}
+
+# Tells a dashboard to reload, for when it may have missed events
+RESYNC_MESSAGE = "event: resync\ndata: {}\n\n"
+
+
+def submission_event(action: str, doc: dict) -> dict:
+    """Build a dashboard event ("created", "updated", "removed") from a raw submission document"""
+    event = {"action": action, "id": str(doc["_id"])}
+    if action == "removed":
+        return event
+
+    created_at = doc.get("created_at") or datetime.utcnow()
+    created_at_ist = to_ist(created_at)
+    event.update({
+        "reg_no": doc.get("reg_no"),
+        "email": doc.get("email"),
+        "slots": doc.get("slots", []),
+        "created_at": created_at_ist,
+        "date": doc.get("date_str") or created_at_ist.strftime("%Y-%m-%d"),
+        "deleted": doc.get("deleted_at") is not None,
+    })
+    return event
+
+
+def document_event(action: str, submission: Submission) -> dict:
+    """Same as submission_event but for a Beanie document the router already holds"""
+    doc = submission.model_dump(include=set(SUBMISSION_PROJECTION))
+    doc["_id"] = submission.id
+    return submission_event(action, doc)
+
+
+def encode_event(event: dict) -> str:
+    """Render the row fragments once and format the SSE message shared by every subscriber"""
+    payload = {"action": event["action"], "id": event["id"]}
+    if event["action"] != "removed":
+        view = "trash" if event["deleted"] else "active"
+        rows = templates.env.get_template("partials/submission_rows.html").module
+        payload.update({
+            "date": event["date"],
+            "deleted": event["deleted"],
+            "row": str(rows.desktop_row(event, view)),
+            "card": str(rows.mobile_card(event, view)),
+        })
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+class ChangeStreamSource:
+    """Reads inserts, edits and deletes from a MongoDB change stream (replica sets only)"""
+
+    reports_updates = True
+
+    async def open(self):
+        collection = Submission.get_pymongo_collection()
+        stream = collection.watch(full_document="updateLookup")
+        if inspect.isawaitable(stream):
+            stream = await stream
+        return stream
+
+    async def events(self, stream=None):
+        stream = stream or await self.open()
+        async with stream:
+            async for change in stream:
+                operation = change["operationType"]
+                if operation == "delete":
+                    yield submission_event("removed", change["documentKey"])
+                elif operation in ("insert", "update", "replace") and change.get("fullDocument"):
+                    action = "created" if operation == "insert" else "updated"
+                    yield submission_event(action, change["fullDocument"])
+
+
+class PollingSource:
+    """
+    Tails submissions by (updated_at, _id), which every insert, edit, soft delete and
+    restore sets, so dashboards on other workers see those too. Hard deletes leave
+    nothing to tail, so routers also publish their own changes locally (on the same
+    worker a change then arrives twice, which is harmless: rows are replaced by id).
+    """
+
+    reports_updates = False
+
+    def __init__(self, interval: float):
+        self.interval = interval
+
+    async def events(self):
+        collection = Submission.get_pymongo_collection()
+        last_updated = datetime.utcnow()
+        last_id = None
+
+        while True:
+            await asyncio.sleep(self.interval)
+
+            if last_id is None:
+                query = {"updated_at": {"$gt": last_updated}}
+            else:
+                query = {"$or": [
+                    {"updated_at": {"$gt": last_updated}},
+                    {"updated_at": last_updated, "_id": {"$gt": last_id}},
+                ]}
+
+            cursor = collection.find(query, SUBMISSION_PROJECTION).sort([("updated_at", 1), ("_id", 1)])
+            async for doc in cursor:
+                last_updated, last_id = doc["updated_at"], doc["_id"]
+                yield submission_event("created" if doc["updated_at"] == doc.get("created_at") else "updated", doc)
+
+
+class AutoSource:
+    """Uses a change stream when the deployment supports one, otherwise falls back to polling"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.reports_updates = False
+
+    async def events(self):
+        change_streams = ChangeStreamSource()
+        try:
+            stream = await change_streams.open()
+        except Exception as e:
+            # Standalone servers reject watch() and mock clients don't implement it
+            print(f"[Live Updates] Change streams unavailable ({e}), falling back to polling")
+            async for event in PollingSource(self.interval).events():
+                yield event
+            return
+
+        self.reports_updates = True
+        async for event in change_streams.events(stream):
+            yield event
+
+
+class FakeEventSource:
+    """In-memory source for tests: events passed to push() are fanned out like real ones"""
+
+    reports_updates = True
+
+    def __init__(self):
+        self._queue = asyncio.Queue()
+
+    def push(self, event: dict):
+        self._queue.put_nowait(event)
+
+    async def events(self):
+        while True:
+            yield await self._queue.get()
+
+
+def default_source():
+    if settings.LIVE_UPDATES_SOURCE == "change_stream":
+        return ChangeStreamSource()
+    if settings.LIVE_UPDATES_SOURCE == "poll":
+        return PollingSource(settings.LIVE_UPDATES_POLL_INTERVAL)
+    return AutoSource(settings.LIVE_UPDATES_POLL_INTERVAL)
+
+
+class SubmissionEventBroker:
+    """
+    Fans one event source out to every open dashboard. The source only runs while
+    at least one dashboard is subscribed, so idle instances never touch the database.
+    If the source fails or ends, subscribers are told to resync (they may have missed
+    events) and a new source is started after a backoff of 1s doubling up to retry_max.
+    """
+
+    def __init__(self, source_factory=default_source, queue_size: int = 100, retry_max: float = settings.LIVE_UPDATES_RETRY_MAX):
+        self.source_factory = source_factory
+        self.queue_size = queue_size
+        self.retry_max = retry_max
+        self.source = None
+        self._subscribers = set()
+        self._pump: Optional[asyncio.Task] = None
+
+    @asynccontextmanager
+    async def subscribe(self):
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        if self._pump is None or self._pump.done():
+            self.source = self.source_factory()
+            self._pump = asyncio.create_task(self._run())
+        try:
+            yield queue
+        finally:
+            self._subscribers.discard(queue)
+            if not self._subscribers and self._pump is not None:
+                self._pump.cancel()
+                self._pump = None
+
+    def publish(self, event: dict, local: bool = False):
+        """
+        Send an event to every subscriber. Routers pass local=True for their own
+        mutations; those are skipped when the source already reports them.
+        """
+        if not self._subscribers:
+            return
+        if local and self.source is not None and self.source.reports_updates:
+            return
+
+        message = encode_event(event)
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Slow client fell behind; tell it to reload instead of buffering forever
+                self._resync(queue)
+
+    @staticmethod
+    def _resync(queue: asyncio.Queue):
+        """Replace whatever the subscriber still had queued with a resync"""
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(RESYNC_MESSAGE)
+
+    async def _run(self):
+        delay = 1.0
+        while True:
+            try:
+                async for event in self.source.events():
+                    self.publish(event)
+                    delay = 1.0
+                print("[Live Updates] Event source ended")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[Live Updates] Event source stopped: {e}")
+
+            # No source while waiting, so routers' own edits still reach the dashboards
+            self.source = None
+            for queue in list(self._subscribers):
+                self._resync(queue)
+            print(f"[Live Updates] Restarting event source in {delay:g}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.retry_max)
+            self.source = self.source_factory()
+
+
+broker = SubmissionEventBroker()
@@ -0,0 +1,99 @@
+"""
+One-off index migration. Run it once before deploying a release whose app/models.py
+replaces or tightens an index:
+
+    python -m app.services.migrate_indexes --check   # only report what would change
+    python -m app.services.migrate_indexes
+
+init_db only creates the indexes the models declare and never drops any, since doing
+that on every cold start could silently remove an index a deployment relies on. This
+script does the dropping, once:
+
+- AdminLog's single-field indexes, superseded by the filter + created_at compounds and
+  by (created_at, _id).
+- A non-unique (reg_no, date_str) index on submissions is replaced by the unique one
+  submit_form relies on against double submits. Duplicates block that, so they are
+  reported instead (run python -m app.services.backfill first: legacy documents without
+  date_str count as duplicates of each other).
+
+Until it has run, init_db logs the conflict and keeps serving without the unique
+index (so deployments without a pre-deploy step stay up). This script talks to
+MongoDB directly rather than through init_db, which would only skip the conflict.
+"""
+import argparse
+import asyncio
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import IndexModel
+
+from app.config import settings
+from app.models import AdminLog, Submission
+
+SUPERSEDED_INDEXES = {
+    AdminLog.Settings.name: ["action_1", "log_type_1", "level_1", "created_at_-1"],
+}
+
+UNIQUE_SUBMISSION_KEY = [("reg_no", 1), ("date_str", 1)]
+
+
+async def drop_superseded(database, check: bool):
+    for collection_name, names in SUPERSEDED_INDEXES.items():
+        existing = await database[collection_name].index_information()
+        for name in names:
+            if name in existing:
+                print(f"[Indexes] {'Would drop' if check else 'Dropping'} {collection_name}.{name}")
+                if not check:
+                    await database[collection_name].drop_index(name)
+
+
+async def duplicate_submissions(collection, limit: int = 20) -> list:
+    pipeline = [
+        {"$group": {"_id": {"reg_no": "$reg_no", "date_str": "$date_str"}, "n": {"$sum": 1}}},
+        {"$match": {"n": {"$gt": 1}}},
+        {"$limit": limit},
+    ]
+    return await collection.aggregate(pipeline).to_list(length=None)
+
+
+async def make_submission_key_unique(database, check: bool) -> int:
+    """Returns the number of duplicate (reg_no, date_str) groups blocking the unique index"""
+    collection = database[Submission.Settings.name]
+    existing = await collection.index_information()
+    current = next((name for name, info in existing.items() if list(info["key"]) == UNIQUE_SUBMISSION_KEY), None)
+
+    if current and existing[current].get("unique"):
+        print(f"[Indexes] {collection.name}.{current} is already unique")
+        return 0
+
+    duplicates = await duplicate_submissions(collection)
+    for group in duplicates:
+        print(f"[Indexes] Duplicate submissions: {group['_id']} x{group['n']}")
+    if duplicates:
+        print("[Indexes] Resolve the duplicates above before the unique index can be built")
+        return len(duplicates)
+
+    if check:
+        print(f"[Indexes] Would make {collection.name} (reg_no, date_str) unique")
+        return 0
+
+    # The server allows only one index per key pattern, so the old one goes first
+    if current:
+        await collection.drop_index(current)
+    await collection.create_indexes([IndexModel(UNIQUE_SUBMISSION_KEY, unique=True)])
+    print(f"[Indexes] {collection.name} (reg_no, date_str) is now unique")
+    return 0
+
+
+async def migrate(check: bool = False) -> int:
+    database = AsyncIOMotorClient(settings.MONGO_URI)[settings.DB_NAME]
+    await drop_superseded(database, check)
+    return await make_submission_key_unique(database, check)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Drop superseded indexes and enforce unique submissions")
+    parser.add_argument("--check", action="store_true", help="Only report what would change")
+    args = parser.parse_args()
+
+    problems = asyncio.run(migrate(args.check))
+    raise SystemExit(1 if problems else 0)
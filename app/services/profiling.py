@@ -0,0 +1,170 @@
+"""
+Opt-in request profiling with cProfile.
+
+Switched on from /admin/profiles, which stores the toggle and sample rate in MongoDB so
+every worker follows it. Admin requests carrying PROFILING_HEADER are profiled even
+while sampling is off. Profiles are written as pstats files (open them with
+`python -m pstats` or snakeviz) to a directory that keeps only the newest
+PROFILING_MAX_FILES.
+
+cProfile follows the event loop thread, so a profile also contains whatever other
+requests the loop ran in the meantime. Time spent waiting on MongoDB or on threadpool
+work (pandas) is not CPU in this thread; compare the recorded wall time with the
+profile's total to see how much of the request was waiting.
+"""
+import cProfile
+import os
+import random
+import re
+import tempfile
+import time
+from datetime import datetime
+from typing import List, Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+
+from app.config import settings
+from app.dependencies import is_admin_session
+from app.models import ProfilingConfig
+
+# Never profiled: static assets, the long-lived dashboard event stream and the viewer itself
+SKIP_PREFIXES = ("/static", "/admin/dashboard/events", "/admin/profiles")
+
+PROFILE_NAME = re.compile(r"^(\d+)-([A-Z]+)-([\w.~-]*)-(\d+)ms\.prof$")
+
+
+class ProfileStore:
+    """Bounded on-disk ring buffer of profiles; the file name carries the request details"""
+
+    def __init__(self, directory: Optional[str] = None, max_files: int = settings.PROFILING_MAX_FILES):
+        self.directory = directory or os.path.join(tempfile.gettempdir(), "kabaddi_profiles")
+        self.max_files = max_files
+
+    def save(self, profiler: cProfile.Profile, method: str, path: str, duration_ms: int) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        slug = re.sub(r"[^\w.~-]+", "_", path.strip("/").replace("/", "~"))
+        name = f"{time.time_ns() // 1_000_000}-{method}-{slug[:80]}-{duration_ms}ms.prof"
+        profiler.dump_stats(os.path.join(self.directory, name))
+        self.prune()
+        return name
+
+    def prune(self):
+        for name in self.names()[self.max_files:]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass  # Another worker pruned it first
+
+    def names(self) -> List[str]:
+        """Profile file names, newest first"""
+        try:
+            names = [n for n in os.listdir(self.directory) if PROFILE_NAME.match(n)]
+        except FileNotFoundError:
+            return []
+        return sorted(names, key=lambda n: int(PROFILE_NAME.match(n).group(1)), reverse=True)
+
+    def entries(self) -> List[dict]:
+        entries = []
+        for name in self.names():
+            created_ms, method, slug, duration_ms = PROFILE_NAME.match(name).groups()
+            try:
+                size = os.path.getsize(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue
+            entries.append({
+                "name": name,
+                "created_at": datetime.utcfromtimestamp(int(created_ms) / 1000),
+                "method": method,
+                "path": "/" + slug.replace("~", "/"),
+                "duration_ms": int(duration_ms),
+                "size": size,
+            })
+        return entries
+
+    def path(self, name: str) -> Optional[str]:
+        """Absolute path of a stored profile, or None for unknown (or crafted) names"""
+        if not PROFILE_NAME.match(name):
+            return None
+        path = os.path.join(self.directory, name)
+        return path if os.path.isfile(path) else None
+
+    def clear(self):
+        for name in self.names():
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+
+
+class ConfigCache:
+    """
+    The admin toggle, re-read from MongoDB at most every `ttl` seconds per worker. If a
+    read fails the last good config is kept (profiling stays off if there is none), and
+    the read is retried after another `ttl`, so an outage never fails the request.
+    """
+
+    def __init__(self, ttl: float = 10.0):
+        self.ttl = ttl
+        self._config: Optional[ProfilingConfig] = None
+        self._loaded_at = 0.0
+
+    async def get(self) -> ProfilingConfig:
+        if self._config is None or time.monotonic() - self._loaded_at > self.ttl:
+            try:
+                self._config = await ProfilingConfig.find_one() or ProfilingConfig()
+            except Exception as e:
+                print(f"[Profiling] Could not load config, keeping the last one: {e}")
+                if self._config is None:
+                    self._config = ProfilingConfig(enabled=False)
+            finally:
+                self._loaded_at = time.monotonic()
+        return self._config
+
+    def invalidate(self):
+        self._loaded_at = 0.0
+
+
+store = ProfileStore(settings.PROFILING_DIR)
+config_cache = ConfigCache()
+
+
+class ProfilingMiddleware:
+    """
+    Pure ASGI middleware (BaseHTTPMiddleware would buffer the dashboard's event stream).
+    Only one request per worker is profiled at a time, since cProfile hooks the whole thread.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._busy = False
+
+    async def should_profile(self, scope) -> bool:
+        if scope["type"] != "http" or self._busy or scope["path"].startswith(SKIP_PREFIXES):
+            return False
+
+        request = Request(scope)
+        if request.headers.get(settings.PROFILING_HEADER) and is_admin_session(request.cookies.get(settings.SESSION_COOKIE)):
+            return True
+
+        config = await config_cache.get()
+        return config.enabled and random.random() < config.sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if not await self.should_profile(scope):
+            return await self.app(scope, receive, send)
+
+        self._busy = True
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profiler.disable()
+            self._busy = False
+            duration_ms = int((time.perf_counter() - start) * 1000)
+            try:
+                await run_in_threadpool(store.save, profiler, scope["method"], scope["path"], duration_ms)
+            except OSError as e:
+                print(f"[Profiling] Could not save profile: {e}")
@@ -0,0 +1,71 @@
+"""
+Read-only query layer for the admin views.
+
+The dashboard, the Excel export and the log page only display what they read, so they
+skip Beanie: each query projects just the rendered fields and returns raw documents
+straight from the Motor cursor. Datetimes are decoded as timezone-aware UTC by the
+driver (AWARE_CODEC) and converted to IST once, where they are rendered (the `ist`
+template filter), instead of in a loop over every result. Independent queries (a page
+and its count, submissions and slots) run concurrently. The dashboard and log reads are
+reporting, so they may be served by a secondary (see app/database.py); the export is not.
+
+Anything that writes goes through the models as before.
+"""
+import asyncio
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from bson.codec_options import CodecOptions
+
+from app.database import REPORTING_READ_PREFERENCE, reporting
+from app.models import AdminLog, Slot
+from app.services import archive
+
+AWARE_CODEC = CodecOptions(tz_aware=True)
+
+SUBMISSION_ROW_FIELDS = {"reg_no": 1, "email": 1, "slots": 1, "created_at": 1}
+EXPORT_FIELDS = {"reg_no": 1, "slots": 1}  # _id stays: archived days are deduplicated on it
+LOG_PAGE_FIELDS = {"created_at": 1, "log_type": 1, "level": 1, "action": 1, "details": 1, "ip_address": 1, "user_agent": 1}
+
+
+class SubmissionRow:
+    """A dashboard row: attribute access like a Submission, without model validation"""
+    __slots__ = ("id", "reg_no", "email", "slots", "created_at", "archived")
+
+    def __init__(self, doc: dict):
+        self.id = doc["_id"]
+        self.reg_no = doc.get("reg_no")
+        self.email = doc.get("email")
+        self.slots = doc.get("slots") or []
+        self.created_at = doc.get("created_at")
+        self.archived = doc.get("archived", False)  # Read from the archive collection, so read-only
+
+
+async def submission_rows(query: dict, target_date: Optional[datetime] = None) -> List[SubmissionRow]:
+    """Dashboard rows, newest first; target_date=None also searches the archive"""
+    docs = await archive.find_submission_docs(
+        query, target_date, projection=SUBMISSION_ROW_FIELDS,
+        sort=[("created_at", -1), ("_id", -1)], codec_options=AWARE_CODEC,
+        read_preference=REPORTING_READ_PREFERENCE
+    )
+    return [SubmissionRow(doc) for doc in docs]
+
+
+async def export_rows(target_date: datetime) -> Tuple[List[dict], List[str]]:
+    """
+    A day's live submissions (reg_no and slots only) and the active slot times, fetched
+    together. Read from the primary: the workbook is stored and served as authoritative.
+    """
+    query = {"date_str": target_date.strftime("%Y-%m-%d"), "deleted_at": None}
+    submissions, slots = await asyncio.gather(
+        archive.find_submission_docs(query, target_date, projection=EXPORT_FIELDS),
+        Slot.get_pymongo_collection().find({"is_active": True}, {"_id": 0, "time": 1}).to_list(length=None)
+    )
+    return submissions, [s["time"] for s in slots]
+
+
+async def log_page(query: dict, skip: int, limit: int) -> Tuple[List[dict], int]:
+    """One page of admin logs, newest first, and the total matching count"""
+    collection = reporting(AdminLog.get_pymongo_collection(), AWARE_CODEC)
+    cursor = collection.find(query, dict(LOG_PAGE_FIELDS)).sort("created_at", -1).skip(skip).limit(limit)
+    return await asyncio.gather(cursor.to_list(length=limit), collection.count_documents(query))
@@ -0,0 +1,65 @@
+import hashlib
+import os
+import tempfile
+from functools import lru_cache
+
+from fastapi import Request
+from fastapi.responses import HTMLResponse, Response
+from fastapi.templating import Jinja2Templates
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+from app.assets import static_url
+from app.config import settings
+from app.utils.dates import to_ist
+
+
+def _bytecode_cache():
+    """Compiled templates are cached on disk so cold starts skip the Jinja parser"""
+    cache_dir = settings.TEMPLATE_CACHE_DIR or os.path.join(tempfile.gettempdir(), "kabaddi_jinja_cache")
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+    except OSError as e:
+        # Read-only filesystems (e.g. serverless) just run without the bytecode cache
+        print(f"[Templates] Bytecode cache disabled: {e}")
+        return None
+    return FileSystemBytecodeCache(cache_dir)
+
+
+env = Environment(
+    loader=FileSystemLoader(settings.TEMPLATE_DIR),
+    autoescape=True,
+    auto_reload=settings.DEBUG,
+    bytecode_cache=_bytecode_cache(),
+)
+
+env.globals["static_url"] = static_url
+env.filters["ist"] = to_ist
+
+# Single template environment shared by every router
+templates = Jinja2Templates(env=env)
+
+
+@lru_cache(maxsize=settings.PAGE_CACHE_SIZE)
+def _render_page(name: str, context_items: tuple):
+    body = templates.get_template(name).render(dict(context_items)).encode("utf-8")
+    etag = f'"{hashlib.sha1(body).hexdigest()}"'
+    return body, etag
+
+
+def cached_page_response(request: Request, name: str, context: dict = None) -> Response:
+    """
+    Render a page whose output depends only on `context` (not on the request),
+    keeping the rendered bytes in memory and answering revalidations with 304.
+    """
+    context = context or {}
+    if settings.DEBUG:
+        return templates.TemplateResponse(name, {"request": request, **context})
+
+    body, etag = _render_page(name, tuple(sorted(context.items())))
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+
+    return HTMLResponse(content=body, headers=headers)
@@ -0,0 +1,41 @@
+from datetime import datetime, timezone, timedelta
+from typing import Optional
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+
+def parse_ist_date(date: str) -> datetime:
+    """Parse a YYYY-MM-DD string as an IST date; raises ValueError if it isn't one"""
+    return datetime.strptime(date, "%Y-%m-%d").replace(tzinfo=IST)
+
+
+def resolve_ist_date(date: Optional[str]) -> datetime:
+    """Parse a YYYY-MM-DD query param as an IST date, falling back to today"""
+    if date:
+        try:
+            return parse_ist_date(date)
+        except ValueError:
+            pass
+    return datetime.now(IST)
+
+
+def utc_day_bounds(target_date: datetime):
+    """Naive UTC start/end of the IST day containing target_date, as stored in MongoDB"""
+    start_of_day_ist = target_date.replace(hour=0, minute=0, second=0, microsecond=0)
+    end_of_day_ist = target_date.replace(hour=23, minute=59, second=59, microsecond=999999)
+    return (
+        start_of_day_ist.astimezone(timezone.utc).replace(tzinfo=None),
+        end_of_day_ist.astimezone(timezone.utc).replace(tzinfo=None),
+    )
+
+
+def ist_date_str(created_at: datetime) -> str:
+    """IST calendar day (YYYY-MM-DD) of a naive UTC timestamp, the value stored in Submission.date_str"""
+    return created_at.replace(tzinfo=timezone.utc).astimezone(IST).strftime("%Y-%m-%d")
+
+
+def to_ist(value: datetime) -> datetime:
+    """A stored timestamp in IST; naive values are UTC as stored in MongoDB"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(IST)
@@ -0,0 +1,24 @@
+from datetime import datetime, timezone
+from bson import ObjectId
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is pinned in requirements, json is only a fallback
+    orjson = None
+    import json
+
+
+def _default(obj):
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, datetime):
+        # MongoDB returns naive UTC datetimes
+        return (obj if obj.tzinfo else obj.replace(tzinfo=timezone.utc)).isoformat()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(obj) -> bytes:
+    """Serialize raw Mongo documents (ObjectId, naive UTC datetimes) to compact JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NAIVE_UTC)
+    return json.dumps(obj, default=_default, separators=(",", ":")).encode("utf-8")
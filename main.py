@@ -1,18 +1,39 @@
 from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
 from contextlib import asynccontextmanager
+from app.config import settings
+from app.assets import STATIC_URL, FingerprintedStaticFiles
 from app.database import init_db
-from app.routers import form, admin, slots
+from app.routers import form, admin, slots, api
+from app.services import digest
+from app.services.profiling import ProfilingMiddleware
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_db()
+    if settings.DIGEST_ENABLED:
+        digest.scheduler.start()
     yield
+    await digest.scheduler.stop()
 
 app = FastAPI(lifespan=lifespan)
 
+# Opt-in cProfile sampling, switched on from /admin/profiles
+app.add_middleware(ProfilingMiddleware)
+
+# Compress HTML/JSON responses; prefer brotli when brotli-asgi is installed (it falls back to gzip itself)
+try:
+    from brotli_asgi import BrotliMiddleware
+    app.add_middleware(BrotliMiddleware, minimum_size=settings.COMPRESSION_MIN_SIZE, gzip_fallback=True)
+except ImportError:
+    app.add_middleware(GZipMiddleware, minimum_size=settings.COMPRESSION_MIN_SIZE)
+
+app.mount(STATIC_URL, FingerprintedStaticFiles(directory=settings.STATIC_DIR), name="static")
+
 app.include_router(form.router)
 app.include_router(admin.router)
 app.include_router(slots.router)
+app.include_router(api.router)
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,30 @@
+document.addEventListener('DOMContentLoaded', () => {
+    const uaElements = document.querySelectorAll('.ua-parse');
+
+    function parseUA(ua) {
+        let browser = "Unknown Browser";
+        if (ua.includes("Firefox")) browser = "Firefox";
+        else if (ua.includes("SamsungBrowser")) browser = "Samsung Internet";
+        else if (ua.includes("Opera") || ua.includes("OPR")) browser = "Opera";
+        else if (ua.includes("Trident")) browser = "Internet Explorer";
+        else if (ua.includes("Edge")) browser = "Edge";
+        else if (ua.includes("Chrome")) browser = "Chrome";
+        else if (ua.includes("Safari")) browser = "Safari";
+
+        let os = "Unknown OS";
+        if (ua.includes("Win")) os = "Windows";
+        else if (ua.includes("Mac")) os = "MacOS";
+        else if (ua.includes("Linux")) os = "Linux";
+        else if (ua.includes("Android")) os = "Android";
+        else if (ua.includes("like Mac")) os = "iOS";
+
+        return `${browser} on ${os}`;
+    }
+
+    uaElements.forEach(el => {
+        const uaString = el.getAttribute('data-ua');
+        if (uaString) {
+            el.textContent = parseUA(uaString);
+        }
+    });
+});
@@ -0,0 +1,47 @@
+// Shared by every page: mobile nav drawer and toast animation
+
+function toggleDrawer() {
+    const drawer = document.getElementById('mobile-drawer');
+    const overlay = document.getElementById('mobile-drawer-overlay');
+
+    if (drawer.classList.contains('translate-x-full')) {
+        // Open
+        drawer.classList.remove('translate-x-full');
+        overlay.classList.remove('hidden');
+        // small delay to allow display:block to apply before opacity transition
+        setTimeout(() => {
+            overlay.classList.remove('opacity-0');
+        }, 10);
+    } else {
+        // Close
+        drawer.classList.add('translate-x-full');
+        overlay.classList.add('opacity-0');
+        setTimeout(() => {
+            overlay.classList.add('hidden');
+        }, 300); // match transition duration
+    }
+}
+
+document.addEventListener('DOMContentLoaded', () => {
+    const container = document.getElementById('toast-container');
+    const toasts = document.querySelectorAll('.toast-message');
+
+    // Each page lists the query params that produced its toasts, e.g. data-clear-params="error,success"
+    if (toasts.length > 0 && container && container.dataset.clearParams) {
+        const url = new URL(window.location);
+        container.dataset.clearParams.split(',').forEach(param => url.searchParams.delete(param.trim()));
+        window.history.replaceState({}, document.title, url.toString());
+    }
+
+    toasts.forEach((toast, index) => {
+        setTimeout(() => {
+            toast.classList.remove('translate-x-full', 'opacity-0');
+        }, 100 * (index + 1));
+
+        // Auto dismiss after 5 seconds
+        setTimeout(() => {
+            toast.classList.add('translate-x-full', 'opacity-0');
+            setTimeout(() => toast.remove(), 300);
+        }, 5000 + (index * 1000));
+    });
+});
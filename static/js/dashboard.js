@@ -0,0 +1,99 @@
+function toggleDatePicker(e, input) {
+    e.preventDefault(); // Stop text selection and default click
+
+    // If the input is already focused, we assume the picker is open.
+    // Blurring it will close the picker.
+    if (document.activeElement === input) {
+        input.blur();
+    } else {
+        // Otherwise focus and open
+        input.focus();
+        try {
+            input.showPicker();
+        } catch (err) {
+            console.error('showPicker failed', err);
+        }
+    }
+}
+
+
+
+// Debounce function for search-while-typing
+let timeout = null;
+const searchInput = document.querySelector('input[name="search"]');
+
+if (searchInput) {
+    const searchForm = searchInput.closest('form');
+
+    // Move cursor to end if input has value (on reload)
+    if (searchInput.value) {
+        searchInput.focus();
+        // Use setTimeout to ensure focus happens after load
+        setTimeout(() => {
+            searchInput.setSelectionRange(searchInput.value.length, searchInput.value.length);
+        }, 0);
+    }
+
+    searchInput.addEventListener('input', function () {
+        clearTimeout(timeout);
+        timeout = setTimeout(function () {
+            searchForm.submit();
+        }, 500); // 500ms delay
+    });
+}
+
+// Logout confirmation
+document.querySelectorAll('a[href="/admin/logout"]').forEach(link => {
+    link.onclick = (e) => {
+        if (!confirm('Are you sure you want to logout?')) {
+            e.preventDefault();
+        }
+    };
+});
+
+// Live updates: patch rows in place as submissions are created, edited or deleted
+const dashboard = document.getElementById('dashboard');
+
+if (dashboard && window.EventSource && !dashboard.dataset.search) {
+    const currentView = dashboard.dataset.view || 'active';
+    const selectedDate = dashboard.dataset.selectedDate;
+    const events = new EventSource(dashboard.dataset.eventsUrl);
+
+    function replaceOrPrepend(container, existing, html) {
+        if (existing) {
+            existing.outerHTML = html;
+        } else {
+            container.insertAdjacentHTML('afterbegin', html);
+        }
+    }
+
+    events.addEventListener('resync', () => window.location.reload());
+
+    events.onmessage = (e) => {
+        const event = JSON.parse(e.data);
+        const row = document.getElementById('row-' + event.id);
+        const card = document.getElementById('card-' + event.id);
+        const belongsHere = event.action !== 'removed'
+            && event.date === selectedDate
+            && event.deleted === (currentView === 'trash');
+
+        if (belongsHere) {
+            const rows = document.getElementById('submission-rows');
+            const cards = document.getElementById('submission-cards');
+            if (!rows || !cards) {
+                // Empty-state page has no table yet; render it once from the server
+                window.location.reload();
+                return;
+            }
+            replaceOrPrepend(rows, row, event.row);
+            replaceOrPrepend(cards, card, event.card);
+        } else {
+            if (row) row.remove();
+            if (card) card.remove();
+        }
+
+        const count = document.getElementById('submission-count');
+        const rows = document.getElementById('submission-rows');
+        if (count && rows) count.textContent = rows.children.length;
+    };
+}
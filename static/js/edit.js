@@ -0,0 +1,117 @@
+// Clear URL params after page load
+if (window.location.search.includes('success')) {
+    window.history.replaceState({}, document.title, window.location.pathname);
+}
+
+// Store selected slots
+const selectedSlots = JSON.parse(document.getElementById('slots-list').dataset.selectedSlots);
+
+function normalizeSlot(name) {
+    return name.replace(/^Slot:\s*/i, '').trim();
+}
+
+async function loadSlots() {
+    const loader = document.getElementById('slots-loader');
+    const slotsList = document.getElementById('slots-list');
+
+    try {
+        const response = await fetch('/api/slots');
+        const activeSlots = await response.json();
+
+        const activeSlotTimes = activeSlots.map(s => normalizeSlot(s.time));
+        const selectedNormalized = selectedSlots.map(s => normalizeSlot(s));
+        const missingSlots = selectedNormalized.filter(s => !activeSlotTimes.includes(s));
+
+        let allSlots = activeSlots.map(s => ({ time: normalizeSlot(s.time), isActive: true }));
+        missingSlots.forEach(s => allSlots.push({ time: s, isActive: false }));
+
+        slotsList.innerHTML = allSlots.map((slot, index) => {
+            const isChecked = selectedNormalized.includes(slot.time);
+            const disabledClass = !slot.isActive ? 'opacity-50' : 'hover:opacity-80';
+            const cursorClass = !slot.isActive ? 'cursor-not-allowed' : 'cursor-pointer';
+
+            return `
+        <div class="flex items-center ${disabledClass} transition duration-150">
+            <input type="checkbox" name="selected_slots" value="${slot.time}" id="slot_${index}"
+                ${isChecked ? 'checked' : ''}
+                class="h-5 w-5 text-blue-600 focus:ring-blue-500 border-gray-300 rounded ${cursorClass}">
+            <label for="slot_${index}" class="ml-3 block text-sm font-medium ${!slot.isActive ? 'text-gray-400' : 'text-gray-700'} ${cursorClass} select-none flex-grow">
+                ${slot.time} ${!slot.isActive ? '<span class="text-xs ml-1">(Unavailable)</span>' : ''}
+            </label>
+        </div>
+    `;
+        }).join('');
+
+        loader.classList.add('hidden');
+        slotsList.classList.remove('hidden');
+    } catch (error) {
+        console.error('Failed to load slots:', error);
+
+        slotsList.innerHTML = selectedSlots.map((slotTime, index) => `
+         <div class="flex items-center hover:opacity-80 transition duration-150">
+            <input type="checkbox" name="selected_slots" value="${slotTime}" id="slot_${index}" checked
+                class="h-5 w-5 text-blue-600 focus:ring-blue-500 border-gray-300 rounded cursor-pointer">
+            <label for="slot_${index}" class="ml-3 block text-sm font-medium text-gray-700 cursor-pointer select-none flex-grow">${slotTime}</label>
+        </div>
+    `).join('');
+        loader.classList.add('hidden');
+        slotsList.classList.remove('hidden');
+    }
+}
+
+loadSlots();
+
+document.querySelector('form').addEventListener('submit', function (e) {
+    const selectedSlots = this.querySelectorAll('input[name="selected_slots"]:checked');
+    const regNoInput = this.querySelector('input[name="reg_no"]');
+    const emailInput = this.querySelector('input[name="email"]');
+    const regNoError = document.getElementById('reg-no-error');
+    const emailError = document.getElementById('email-error');
+    const regNoValue = regNoInput.value.trim().toUpperCase();
+    const emailValue = emailInput.value.trim();
+
+    // Reset error styling
+    regNoInput.classList.remove('border-red-500', 'ring-1', 'ring-red-500');
+    regNoError.classList.add('hidden');
+    regNoError.textContent = '';
+    emailInput.classList.remove('border-red-500', 'ring-1', 'ring-red-500');
+    emailError.classList.add('hidden');
+    emailError.textContent = '';
+
+    // Validate reg_no format
+    const regNoPattern = /^\d{2}[A-Za-z]{3}\d{5}$/;
+    if (!regNoValue) {
+        e.preventDefault();
+        regNoInput.classList.add('border-red-500', 'ring-1', 'ring-red-500');
+        regNoError.textContent = 'Registration Number is required.';
+        regNoError.classList.remove('hidden');
+        regNoInput.focus();
+        return;
+    }
+    if (!regNoPattern.test(regNoValue)) {
+        e.preventDefault();
+        regNoInput.classList.add('border-red-500', 'ring-1', 'ring-red-500');
+        regNoError.textContent = 'Invalid format. Example: 23BAI10056';
+        regNoError.classList.remove('hidden');
+        regNoInput.focus();
+        return;
+    }
+
+    // Check for at least one slot
+    if (selectedSlots.length === 0) {
+        e.preventDefault();
+        alert("Please select at least one slot.");
+        return;
+    }
+
+    const btn = this.querySelector('button[type="submit"]');
+    btn.disabled = true;
+    btn.innerHTML = `
+    <svg class="animate-spin -ml-1 mr-3 h-5 w-5 text-white inline-block" xmlns="http://www.w3.org/2000/svg" fill="none" viewBox="0 0 24 24">
+        <circle class="opacity-25" cx="12" cy="12" r="10" stroke="currentColor" stroke-width="4"></circle>
+        <path class="opacity-75" fill="currentColor" d="M4 12a8 8 0 018-8V0C5.373 0 0 5.373 0 12h4zm2 5.291A7.962 7.962 0 014 12H0c0 3.042 1.135 5.824 3 7.938l3-2.647z"></path>
+    </svg>
+    Updating...
+`;
+    btn.classList.add('opacity-75', 'cursor-not-allowed');
+});
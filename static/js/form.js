@@ -0,0 +1,153 @@
+// Async Slot Loading with Full Page Loader
+async function loadSlots() {
+    const pageLoader = document.getElementById('page-loader');
+    const mainContent = document.getElementById('main-content');
+    const slotsList = document.getElementById('slots-list');
+
+    try {
+        const response = await fetch('/api/slots');
+        const slots = await response.json();
+
+        if (slots.length === 0) {
+            slotsList.innerHTML = '<div class="text-center py-2"><p class="text-gray-500 text-sm font-medium">No slots available at the moment.</p></div>';
+        } else {
+            slotsList.innerHTML = slots.map((slot, index) => {
+                // remaining is null for slots without a capacity
+                const isFull = slot.remaining === 0;
+                const seats = slot.remaining === null || slot.remaining === undefined ? ''
+                    : isFull ? '<span class="text-xs text-red-500 ml-1">(Full)</span>'
+                    : `<span class="text-xs text-gray-500 ml-1">(${slot.remaining} ${slot.remaining === 1 ? 'seat' : 'seats'} left)</span>`;
+
+                return `
+                <div class="flex items-center ${isFull ? 'opacity-50' : ''}">
+                    <input type="checkbox" name="selected_slots" value="${slot.time}" id="slot_${index}" ${isFull ? 'disabled' : ''}
+                        class="h-5 w-5 text-blue-600 focus:ring-blue-500 border-gray-300 rounded ${isFull ? 'cursor-not-allowed' : 'cursor-pointer'} transition duration-150 ease-in-out">
+                    <label for="slot_${index}" class="ml-3 block text-sm font-medium text-gray-700 ${isFull ? 'cursor-not-allowed' : 'cursor-pointer'} select-none">
+                        ${slot.time} ${seats}
+                    </label>
+                </div>
+            `;
+            }).join('');
+        }
+
+        // Hide loader, show main content
+        pageLoader.classList.add('hidden');
+        mainContent.classList.remove('hidden');
+    } catch (error) {
+        console.error('Failed to load slots:', error);
+        slotsList.innerHTML = '<p class="text-red-500 text-sm">Failed to load slots. Please refresh.</p>';
+        pageLoader.classList.add('hidden');
+        mainContent.classList.remove('hidden');
+    }
+}
+
+// Load slots on page load
+loadSlots();
+
+// Form Validation
+const form = document.getElementById('registrationForm');
+
+// Fresh idempotency token per page view (the page HTML itself is cached and shared)
+document.getElementById('idempotency_key').value = window.crypto && crypto.randomUUID
+    ? crypto.randomUUID()
+    : Date.now().toString(36) + '-' + Math.random().toString(36).slice(2);
+
+const errorDiv = document.getElementById('js-error');
+const errorText = document.getElementById('js-error-text');
+
+// Initialize Zod from UMD global
+const z = window.Zod;
+
+// Create Zod Schema
+// Email is required and must end with @vitbhopal.ac.in
+const emailSchema = z.string()
+    .email()
+    .endsWith("@vitbhopal.ac.in", { message: "Email must be a valid @vitbhopal.ac.in address" });
+
+form.addEventListener('submit', function (e) {
+    const regNoInput = form.querySelector('input[name="reg_no"]').value.trim().toUpperCase();
+    const emailInput = form.querySelector('input[name="email"]').value.trim();
+    const emailField = form.querySelector('input[name="email"]');
+    const emailError = document.getElementById('email-error');
+    const selectedSlots = form.querySelectorAll('input[name="selected_slots"]:checked');
+
+    // Reset email error styling
+    emailField.classList.remove('border-red-500', 'ring-1', 'ring-red-500');
+    emailError.classList.add('hidden');
+    emailError.textContent = '';
+
+    // Reset reg_no error styling
+    const regNoField = form.querySelector('input[name="reg_no"]');
+    const regNoError = document.getElementById('reg-no-error');
+    regNoField.classList.remove('border-red-500', 'ring-1', 'ring-red-500');
+    regNoError.classList.add('hidden');
+    regNoError.textContent = '';
+
+    // Check for at least one slot
+    if (selectedSlots.length === 0) {
+        e.preventDefault();
+        errorText.textContent = "Please select at least one slot.";
+        errorDiv.classList.remove('hidden');
+        window.scrollTo({ top: 0, behavior: 'smooth' });
+        return;
+    }
+
+    // Validate registration number format first
+    const regNoPattern = /^\d{2}[A-Za-z]{3}\d{5}$/;
+    if (!regNoInput) {
+        e.preventDefault();
+        regNoField.classList.add('border-red-500', 'ring-1', 'ring-red-500');
+        regNoError.textContent = 'Registration Number is required.';
+        regNoError.classList.remove('hidden');
+        regNoField.focus();
+        return;
+    }
+    if (!regNoPattern.test(regNoInput)) {
+        e.preventDefault();
+        regNoField.classList.add('border-red-500', 'ring-1', 'ring-red-500');
+        regNoError.textContent = 'Invalid format. Example: 23BAI10056';
+        regNoError.classList.remove('hidden');
+        regNoField.focus();
+        return;
+    }
+
+    // Validate email domain
+    const result = emailSchema.safeParse(emailInput);
+
+    if (!result.success) {
+        e.preventDefault();
+        const msg = result.error.errors[0].message;
+        emailField.classList.add('border-red-500', 'ring-1', 'ring-red-500');
+        emailError.textContent = msg;
+        emailError.classList.remove('hidden');
+        emailField.focus();
+        return;
+    }
+
+    // Validate email format: name.{reg_no}@vitbhopal.ac.in
+    const emailPrefix = emailInput.split('@')[0].toLowerCase();
+    const expectedSuffix = '.' + regNoInput.toLowerCase();
+    if (!emailPrefix.endsWith(expectedSuffix)) {
+        e.preventDefault();
+        emailField.classList.add('border-red-500', 'ring-1', 'ring-red-500');
+        emailError.textContent = 'Email doesn\'t match the registration number';
+        emailError.classList.remove('hidden');
+        emailField.focus();
+        return;
+    }
+
+    // Hide error if previously shown
+    errorDiv.classList.add('hidden');
+
+    // Show loading state
+    const submitBtn = form.querySelector('button[type="submit"]');
+    submitBtn.disabled = true;
+    submitBtn.innerHTML = `
+        <svg class="animate-spin -ml-1 mr-3 h-5 w-5 text-white inline-block" xmlns="http://www.w3.org/2000/svg" fill="none" viewBox="0 0 24 24">
+            <circle class="opacity-25" cx="12" cy="12" r="10" stroke="currentColor" stroke-width="4"></circle>
+            <path class="opacity-75" fill="currentColor" d="M4 12a8 8 0 018-8V0C5.373 0 0 5.373 0 12h4zm2 5.291A7.962 7.962 0 014 12H0c0 3.042 1.135 5.824 3 7.938l3-2.647z"></path>
+        </svg>
+        Submitting...
+    `;
+    submitBtn.classList.add('opacity-75', 'cursor-not-allowed');
+});
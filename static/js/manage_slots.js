@@ -0,0 +1,69 @@
+function showToast(message, type = 'success') {
+    const container = document.getElementById('toast-container');
+    const colorClass = type === 'error' ? 'text-red-500' : 'text-green-500';
+    const borderClass = type === 'error' ? 'border-red-500' : 'border-green-500';
+    const iconPath = type === 'error'
+        ? 'M12 9v2m0 4h.01m-6.938 4h13.856c1.54 0 2.502-1.667 1.732-3L13.732 4c-.77-1.333-2.694-1.333-3.464 0L3.34 16c-.77 1.333.192 3 1.732 3z'
+        : 'M5 13l4 4L19 7';
+
+    const html = `
+    <div class="toast-message bg-white border-l-4 ${borderClass} shadow-lg rounded-r-lg px-4 py-3 min-w-[300px] transform transition-all duration-300 translate-x-full opacity-0 pointer-events-auto flex items-start">
+            <div class="flex-shrink-0">
+                <svg class="h-5 w-5 ${colorClass}" fill="none" viewBox="0 0 24 24" stroke="currentColor">
+                    <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="${iconPath}" />
+                </svg>
+            </div>
+            <div class="ml-3">
+                <p class="text-sm font-medium text-gray-900">${message}</p>
+            </div>
+            <button onclick="this.closest('.toast-message').remove()" class="ml-auto flex-shrink-0 text-gray-400 hover:text-gray-500">
+                <svg class="h-4 w-4" fill="none" viewBox="0 0 24 24" stroke="currentColor">
+                    <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M6 18L18 6M6 6l12 12" />
+                </svg>
+            </button>
+    </div>
+    `;
+
+    container.insertAdjacentHTML('beforeend', html);
+    const toast = container.lastElementChild;
+
+    // Animate in
+    requestAnimationFrame(() => {
+        toast.classList.remove('translate-x-full', 'opacity-0');
+    });
+
+    // Auto dismiss
+    setTimeout(() => {
+        toast.classList.add('translate-x-full', 'opacity-0');
+        setTimeout(() => toast.remove(), 300);
+    }, 5000);
+}
+
+if (window.location.search.includes('error=exists')) {
+    // Ensure DOM is ready (though we are at bottom of body usually)
+    document.addEventListener('DOMContentLoaded', () => {
+        showToast("Slot with this time already exists.", "error");
+    });
+    window.history.replaceState({}, document.title, window.location.pathname);
+}
+
+if (window.location.search.includes('error=capacity')) {
+    document.addEventListener('DOMContentLoaded', () => {
+        showToast("Capacity must be a whole number (leave blank for unlimited).", "error");
+    });
+    window.history.replaceState({}, document.title, window.location.pathname);
+}
+
+// Loading state for Add Slot
+document.querySelector('form[action="/admin/slots"]').addEventListener('submit', function () {
+    const btn = this.querySelector('button[type="submit"]');
+    btn.disabled = true;
+    btn.innerHTML = `
+        <svg class="animate-spin -ml-1 mr-2 h-4 w-4 text-white inline-block" xmlns="http://www.w3.org/2000/svg" fill="none" viewBox="0 0 24 24">
+            <circle class="opacity-25" cx="12" cy="12" r="10" stroke="currentColor" stroke-width="4"></circle>
+            <path class="opacity-75" fill="currentColor" d="M4 12a8 8 0 018-8V0C5.373 0 0 5.373 0 12h4zm2 5.291A7.962 7.962 0 014 12H0c0 3.042 1.135 5.824 3 7.938l3-2.647z"></path>
+        </svg>
+        Adding...
+    `;
+    btn.classList.add('opacity-75', 'cursor-not-allowed');
+});
@@ -0,0 +1,126 @@
+const regNo = document.querySelector('form').dataset.regNo.toUpperCase();
+
+document.querySelector('form').addEventListener('submit', function (e) {
+    const selectedSlots = this.querySelectorAll('input[name="selected_slots"]:checked');
+    const emailInput = this.querySelector('input[name="email"]');
+    const emailError = document.getElementById('email-error');
+    const emailValue = emailInput.value.trim();
+
+    // Reset error styling
+    emailInput.classList.remove('border-red-500', 'ring-1', 'ring-red-500', 'bg-red-50');
+    emailError.classList.add('hidden');
+    emailError.textContent = '';
+
+    // Check for at least one slot
+    if (selectedSlots.length === 0) {
+        e.preventDefault();
+        alert("Please select at least one slot.");
+        return;
+    }
+
+    // Validate email domain
+    if (!emailValue.endsWith('@vitbhopal.ac.in')) {
+        e.preventDefault();
+        emailInput.classList.add('border-red-500', 'ring-1', 'ring-red-500', 'bg-red-50');
+        emailError.textContent = 'Email must be a VIT Bhopal email (@vitbhopal.ac.in)';
+        emailError.classList.remove('hidden');
+        emailInput.focus();
+        return;
+    }
+
+    // Validate email format: name.{reg_no}@vitbhopal.ac.in
+    const emailPrefix = emailValue.split('@')[0].toLowerCase();
+    const expectedSuffix = '.' + regNo.toLowerCase();
+    if (!emailPrefix.endsWith(expectedSuffix)) {
+        e.preventDefault();
+        emailInput.classList.add('border-red-500', 'ring-1', 'ring-red-500', 'bg-red-50');
+        emailError.textContent = "Email doesn't match the registration number";
+        emailError.classList.remove('hidden');
+        emailInput.focus();
+        return;
+    }
+
+    const btn = this.querySelector('button[type="submit"]');
+    btn.disabled = true;
+    btn.innerHTML = `
+        <svg class="animate-spin -ml-1 mr-3 h-5 w-5 text-white inline-block" xmlns="http://www.w3.org/2000/svg" fill="none" viewBox="0 0 24 24">
+            <circle class="opacity-25" cx="12" cy="12" r="10" stroke="currentColor" stroke-width="4"></circle>
+            <path class="opacity-75" fill="currentColor" d="M4 12a8 8 0 018-8V0C5.373 0 0 5.373 0 12h4zm2 5.291A7.962 7.962 0 014 12H0c0 3.042 1.135 5.824 3 7.938l3-2.647z"></path>
+        </svg>
+        Updating...
+    `;
+    btn.classList.add('opacity-75', 'cursor-not-allowed');
+});
+
+// Clear URL params after page load to prevent resubmission issues
+if (window.location.search.includes('success') || window.location.search.includes('no_change')) {
+    window.history.replaceState({}, document.title, window.location.pathname);
+}
+
+// Store which slots are currently selected (from server)
+const selectedSlots = JSON.parse(document.getElementById('slots-list').dataset.selectedSlots);
+
+// Normalize slot name (remove "Slot: " or "Slot:" prefix)
+function normalizeSlot(name) {
+    return name.replace(/^Slot:\s*/i, '').trim();
+}
+
+async function loadSlots() {
+    const loader = document.getElementById('slots-loader');
+    const slotsList = document.getElementById('slots-list');
+
+    try {
+        const response = await fetch('/api/slots');
+        const activeSlots = await response.json();
+
+        // Get active slot times (normalized)
+        const activeSlotTimes = activeSlots.map(s => normalizeSlot(s.time));
+
+        // Get previously selected slots (normalized) that are not in active list
+        const selectedNormalized = selectedSlots.map(s => normalizeSlot(s));
+        const missingSlots = selectedNormalized.filter(s => !activeSlotTimes.includes(s));
+
+        // Build final list: active slots + missing selected slots
+        let allSlots = activeSlots.map(s => ({ time: normalizeSlot(s.time), isActive: true }));
+        missingSlots.forEach(s => allSlots.push({ time: s, isActive: false }));
+
+        slotsList.innerHTML = allSlots.map((slot, index) => {
+            const isChecked = selectedNormalized.includes(slot.time);
+            // Minimal styling for list items inside the card
+            const disabledClass = !slot.isActive ? 'opacity-50' : 'hover:opacity-80';
+            const cursorClass = !slot.isActive ? 'cursor-not-allowed' : 'cursor-pointer';
+            const disabledInput = !slot.isActive ? 'disabled' : '';
+
+            return `
+            <div class="flex items-center ${disabledClass} transition duration-150">
+                <input type="checkbox" name="selected_slots" value="${slot.time}" id="slot_${index}"
+                    ${isChecked ? 'checked' : ''} ${disabledInput}
+                     class="h-5 w-5 text-blue-600 focus:ring-blue-500 border-gray-300 rounded ${cursorClass}">
+                <label for="slot_${index}" class="ml-3 block text-sm font-medium ${!slot.isActive ? 'text-gray-400' : 'text-gray-700'} ${cursorClass} select-none flex-grow">
+                    ${slot.time} ${!slot.isActive ? '<span class="text-xs ml-1">(Unavailable)</span>' : ''}
+                </label>
+            </div>
+        `;
+        }).join('');
+
+        loader.classList.add('hidden');
+        slotsList.classList.remove('hidden');
+    } catch (error) {
+        console.error('Failed to load slots:', error);
+
+        // Fallback: show only selected slots
+        slotsList.innerHTML = selectedSlots.map((slotTime, index) => `
+            <div class="flex items-center hover:opacity-80 transition duration-150">
+                <input type="checkbox" name="selected_slots" value="${slotTime}" id="slot_${index}" checked
+                     class="h-5 w-5 text-blue-600 focus:ring-blue-500 border-gray-300 rounded cursor-pointer">
+                <label for="slot_${index}" class="ml-3 block text-sm font-medium text-gray-700 cursor-pointer select-none flex-grow">
+                    ${slotTime}
+                </label>
+            </div>
+        `).join('');
+        loader.classList.add('hidden');
+        slotsList.classList.remove('hidden');
+    }
+}
+
+loadSlots();
@@ -0,0 +1,195 @@
+"""
+Explain-plan regression tests for the queries the routers and services issue.
+
+mongomock has no query planner, so these run against a real MongoDB and are skipped
+when none is reachable:
+
+    TEST_MONGO_URI=mongodb://localhost:27017 python -m pytest tests/test_query_plans.py
+
+Every query shape below is explained with executionStats in a throwaway database that
+is seeded with a few days of data and the indexes from app/models.py. A shape fails if
+its plan uses a COLLSCAN or examines far more documents than it returns, so new queries
+have to come with a matching index.
+"""
+import os
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from beanie import init_beanie
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+from app.database import DOCUMENT_MODELS
+from app.models import Submission, Admin, Slot, AdminLog, IdempotencyRecord, SlotCounter, DailyExport, ArchiveState
+from app.routers.admin import LOG_ACTION_CATEGORIES, build_log_filter
+from app.utils.dates import resolve_ist_date, utc_day_bounds
+
+TEST_MONGO_URI = os.environ.get("TEST_MONGO_URI", "mongodb://localhost:27017")
+TEST_DB_NAME = "kabaddi_query_plans_test"
+
+MAX_RATIO = 2.0  # Allowed docs examined per doc returned
+SLACK = 100  # Docs examined always allowed on top of the ratio
+
+
+def mongo_available() -> bool:
+    try:
+        MongoClient(TEST_MONGO_URI, serverSelectionTimeoutMS=1000).admin.command("ping")
+        return True
+    except PyMongoError:
+        return False
+
+
+pytestmark = [
+    pytest.mark.skipif(not mongo_available(), reason=f"no MongoDB at {TEST_MONGO_URI} (set TEST_MONGO_URI)"),
+    pytest.mark.asyncio(loop_scope="module"),
+]
+
+
+def query_shapes() -> list:
+    """One entry per query issued by the routers and services, with representative values"""
+    today = resolve_ist_date(None)
+    today_str = today.strftime("%Y-%m-%d")
+    start_of_day_utc, end_of_day_utc = utc_day_bounds(today)
+    some_id = ObjectId()
+    newest_first = [("created_at", -1)]
+    newest_first_by_id = [("created_at", -1), ("_id", -1)]
+    after_cursor = {"$or": [
+        {"created_at": {"$lt": end_of_day_utc}},
+        {"created_at": end_of_day_utc, "_id": {"$lt": some_id}}
+    ]}
+
+    return [
+        # form.py / slots.py
+        {"name": "active slots", "model": Slot, "filter": {"is_active": True}},
+        {"name": "slot by time", "model": Slot, "filter": {"time": "9:00 AM"}},
+        {"name": "all slots", "model": Slot, "filter": {}, "allow_collscan": True},  # Admin slot list reads everything
+        {"name": "duplicate submission", "model": Submission, "filter": {"reg_no": "23BAI10056", "date_str": today_str}},
+        {"name": "idempotency key", "model": IdempotencyRecord, "filter": {"key": "00000000-0000"}},
+        {"name": "slot capacities", "model": Slot, "filter": {"time": {"$in": ["9:00 AM", "11:00 AM"]}}},
+        {"name": "slot counter seat", "model": SlotCounter, "filter": {"slot": "9:00 AM", "date_str": today_str, "taken": {"$lt": 40}}},
+        {"name": "remaining seats", "model": SlotCounter, "filter": {"slot": {"$in": ["9:00 AM", "11:00 AM"]}, "date_str": today_str}},
+
+        # admin.py
+        {"name": "admin login", "model": Admin, "filter": {"username": "admin"}},
+        {"name": "dashboard (active day)", "model": Submission, "filter": {"deleted_at": None, "date_str": today_str}, "sort": newest_first_by_id},
+        {"name": "dashboard (trash day)", "model": Submission, "filter": {"deleted_at": {"$ne": None}, "date_str": today_str}, "sort": newest_first_by_id},
+        {"name": "dashboard (search)", "model": Submission, "filter": {"deleted_at": None, "email": {"$regex": "^name", "$options": "i"}}, "sort": newest_first_by_id},
+        {"name": "download day", "model": Submission, "filter": {"date_str": today_str, "deleted_at": None}},
+        {"name": "empty trash", "model": Submission, "filter": {"deleted_at": {"$ne": None}}},
+        {"name": "logs (all)", "model": AdminLog, "filter": build_log_filter(), "sort": newest_first, "limit": 20},
+        {"name": "logs (auth)", "model": AdminLog, "filter": build_log_filter("auth"), "sort": newest_first, "limit": 20},
+        {"name": "logs (errors)", "model": AdminLog, "filter": build_log_filter("errors", "ERROR"), "sort": newest_first, "limit": 20},
+        {"name": "logs (level)", "model": AdminLog, "filter": build_log_filter(None, "WARNING"), "sort": newest_first, "limit": 20},
+        {"name": "logs export (action, range)", "model": AdminLog, "filter": {"action": "login_failed", "created_at": {"$gte": start_of_day_utc, "$lte": end_of_day_utc}}, "sort": newest_first},
+        {"name": "logs export (range)", "model": AdminLog, "filter": {"created_at": {"$gte": start_of_day_utc, "$lte": end_of_day_utc}}, "sort": newest_first},
+
+        # api.py (cursor pagination adds an _id tie-breaker, later pages an $or after the cursor)
+        {"name": "api submissions page", "model": Submission, "filter": {"$and": [{"deleted_at": None}, {"date_str": today_str}]}, "sort": newest_first_by_id, "limit": 101},
+        {"name": "api submissions next page", "model": Submission, "filter": {"$and": [{"$and": [{"deleted_at": None}, {"date_str": today_str}]}, after_cursor]}, "sort": newest_first_by_id, "limit": 101},
+        {"name": "api logs page", "model": AdminLog, "filter": build_log_filter(), "sort": newest_first_by_id, "limit": 101},
+        {"name": "api logs next page", "model": AdminLog, "filter": {"$and": [build_log_filter("auth"), after_cursor]}, "sort": newest_first_by_id, "limit": 101},
+
+        # services
+        {"name": "live updates tail poll", "model": Submission, "filter": {"updated_at": {"$gt": end_of_day_utc}}, "sort": [("updated_at", 1), ("_id", 1)]},
+        {"name": "live updates tail poll (tie)", "model": Submission, "filter": {"$or": [
+            {"updated_at": {"$gt": end_of_day_utc}},
+            {"updated_at": end_of_day_utc, "_id": {"$gt": some_id}}
+        ]}, "sort": [("updated_at", 1), ("_id", 1)]},
+        {"name": "date_str backfill batch", "model": Submission, "filter": {"date_str": None}, "sort": [("_id", 1)], "limit": 1000},
+        {"name": "stored daily export", "model": DailyExport, "filter": {"date_str": today_str}},
+        {"name": "digest claim", "model": DailyExport, "filter": {"date_str": today_str, "completed_at": None, "$or": [
+            {"claimed_at": None}, {"claimed_at": {"$lt": start_of_day_utc}}
+        ]}},
+        # One document per day: scanning them all when the slots change is cheap
+        {"name": "invalidate all exports", "model": DailyExport, "filter": {}, "allow_collscan": True},
+        {"name": "archive state", "model": ArchiveState, "filter": {}, "allow_collscan": True},  # Single document
+        {"name": "archive pending check", "model": Submission, "filter": {"created_at": {"$lt": start_of_day_utc}}, "limit": 1},
+        {"name": "archive move batch", "model": Submission, "filter": {"created_at": {"$lt": start_of_day_utc}, "_id": {"$gt": some_id}}, "sort": [("_id", 1)], "limit": 500},
+    ]
+
+
+async def seed():
+    """A few days of submissions (some trashed) and logs, so the planner has real choices"""
+    now = datetime.utcnow()
+    await Slot.insert_many([Slot(time=f"{hour}:00 AM", is_active=hour % 3 != 0) for hour in range(7, 13)])
+
+    submissions = []
+    for day in range(5):
+        created_at = now - timedelta(days=day)
+        date_str = resolve_ist_date(None) - timedelta(days=day)
+        for i in range(200):
+            submissions.append(Submission(
+                reg_no=f"23BAI1{i:04d}",
+                email=f"student.23bai1{i:04d}@vitbhopal.ac.in",
+                slots=["7:00 AM"],
+                date_str=date_str.strftime("%Y-%m-%d"),
+                created_at=created_at - timedelta(minutes=i),
+                updated_at=created_at - timedelta(minutes=i),
+                deleted_at=created_at if i % 10 == 0 else None
+            ))
+    await Submission.insert_many(submissions)
+
+    actions = [action for category in LOG_ACTION_CATEGORIES.values() for action in category] + ["error"]
+    await AdminLog.insert_many([
+        AdminLog(
+            action=actions[i % len(actions)],
+            log_type="error" if actions[i % len(actions)] == "error" else "admin",
+            level="ERROR" if i % 25 == 0 else "INFO",
+            created_at=now - timedelta(minutes=i * 7)
+        )
+        for i in range(1000)
+    ])
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def plans_db():
+    client = AsyncIOMotorClient(TEST_MONGO_URI)
+    await client.drop_database(TEST_DB_NAME)
+    await init_beanie(database=client[TEST_DB_NAME], document_models=DOCUMENT_MODELS)
+    await seed()
+    yield client[TEST_DB_NAME]
+    await client.drop_database(TEST_DB_NAME)
+
+
+def find_stages(plan, stage_name: str) -> list:
+    """Collect every plan node with the given stage name (classic and SBE plan layouts)"""
+    found = []
+    if isinstance(plan, dict):
+        if plan.get("stage") == stage_name:
+            found.append(plan)
+        for value in plan.values():
+            found.extend(find_stages(value, stage_name))
+    elif isinstance(plan, list):
+        for item in plan:
+            found.extend(find_stages(item, stage_name))
+    return found
+
+
+def plan_problems(shape: dict, explain: dict) -> list:
+    problems = []
+    winning_plan = explain.get("queryPlanner", {}).get("winningPlan", {})
+
+    if find_stages(winning_plan, "COLLSCAN") and not shape.get("allow_collscan"):
+        problems.append("COLLSCAN")
+
+    stats = explain.get("executionStats", {})
+    examined, returned = stats.get("totalDocsExamined", 0), stats.get("nReturned", 0)
+    if examined > returned * MAX_RATIO + SLACK:
+        problems.append(f"examined {examined} docs for {returned} returned")
+
+    return problems
+
+
+@pytest.mark.parametrize("shape", query_shapes(), ids=lambda shape: shape["name"])
+async def test_query_uses_an_index(plans_db, shape):
+    cursor = plans_db[shape["model"].Settings.name].find(shape["filter"])
+    if shape.get("sort"):
+        cursor = cursor.sort(shape["sort"])
+    if shape.get("limit"):
+        cursor = cursor.limit(shape["limit"])
+
+    explain = await cursor.explain()
+    assert plan_problems(shape, explain) == []
@@ -0,0 +1,260 @@
+"""
+Per-route MongoDB round-trip budgets.
+
+Drives the app in-process against mongomock-motor, counts the database commands each
+request issues and compares them with ROUTE_BUDGETS:
+
+    python -m pytest tests/test_round_trips.py
+
+Every route is measured twice, once with a small and once with a larger seeded day. A
+route fails if it goes over its budget or if its count grows with the amount of data,
+which is what an N+1 loop looks like. A change that really needs another round trip has
+to raise the budget here, in the same diff.
+
+CommandCounter is a pymongo CommandListener, so the same counter can be passed to
+init_db(event_listeners=[...]) against a real server. mongomock never talks to a
+server, so the `route_counts` fixture wraps its collection methods to report one
+CommandStartedEvent per top-level call instead, and restores them afterwards.
+"""
+import itertools
+from collections import Counter
+from datetime import datetime
+from functools import wraps
+
+import pytest
+from fastapi.testclient import TestClient
+from mongomock.collection import Collection
+from mongomock_motor import AsyncMongoMockClient
+from pymongo import monitoring
+
+import app.database as database
+import main
+from app.config import settings
+from app.dependencies import signer
+from app.services import archive, profiling
+from app.utils.dates import resolve_ist_date
+
+# Most commands one request to each scenario below may issue
+ROUTE_BUDGETS = {
+    "form page": 0,  # Served from the render cache
+    "slot list": 1,
+    "submit form": 7,  # Slots, duplicate check, 2 seat counters, insert, export invalidation, idempotency record
+    "user edit": 5,  # Get, slots, seat counter, save, export invalidation
+    "admin dashboard": 1,
+    "admin download": 4,  # Stored export, submissions, slots, log
+    "admin edit": 7,  # Get, slot capacities, 2 seat counters, save, export invalidation, log
+    "admin delete": 5,  # Get, save, 2 seat counters, export invalidation, log
+    "admin restore": 5,
+    "admin hard delete": 3,  # Get, delete, log
+    "admin empty trash": 3,  # Trash, delete, log; the same however full the trash is
+    "admin logs": 2,  # Count + page
+    "admin logs export": 2,  # Log, one streamed cursor
+    "api submissions": 1,
+    "api logs": 1,
+    "admin slots page": 1,  # Slots; no counters while no slot has a capacity
+    "admin add slot": 3,  # Duplicate check, insert, export invalidation
+    "admin slot capacity": 2,  # Get, save
+    "admin toggle slot": 3,  # Get, save, export invalidation
+    "admin delete slot": 3,  # Get, delete, export invalidation
+}
+
+# mongomock collection methods and the server command each one costs
+METHOD_COMMANDS = {
+    "aggregate": "aggregate", "bulk_write": "bulkWrite", "count_documents": "aggregate", "delete_many": "delete",
+    "delete_one": "delete", "distinct": "distinct", "estimated_document_count": "count", "find": "find",
+    "find_one": "find", "find_one_and_delete": "findAndModify", "find_one_and_replace": "findAndModify",
+    "find_one_and_update": "findAndModify", "insert_many": "insert", "insert_one": "insert",
+    "replace_one": "update", "update_many": "update", "update_one": "update",
+}
+
+
+class CommandCounter(monitoring.CommandListener):
+    """Counts commands by name between reset() calls"""
+
+    def __init__(self):
+        self.commands = Counter()
+
+    def reset(self):
+        self.commands = Counter()
+
+    @property
+    def total(self) -> int:
+        return sum(self.commands.values())
+
+    def started(self, event):
+        if event.command_name not in ("getMore", "endSessions", "killCursors"):
+            self.commands[event.command_name] += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def instrument_mongomock(monkeypatch, listener: monitoring.CommandListener):
+    """Report every top-level mongomock collection call to the listener (nested calls are one command)"""
+    depth = 0
+    request_ids = itertools.count(1)
+
+    def counted(command_name, method):
+        @wraps(method)
+        def wrapper(collection, *args, **kwargs):
+            nonlocal depth
+            if depth == 0:
+                request_id = next(request_ids)
+                listener.started(monitoring.CommandStartedEvent(
+                    {command_name: collection.name}, collection.database.name, request_id, ("mongomock", 0), request_id
+                ))
+            depth += 1
+            try:
+                return method(collection, *args, **kwargs)
+            finally:
+                depth -= 1
+        return wrapper
+
+    for method_name, command_name in METHOD_COMMANDS.items():
+        monkeypatch.setattr(Collection, method_name, counted(command_name, getattr(Collection, method_name)))
+
+
+def scenarios(ctx: dict) -> list:
+    """
+    One request per budgeted route; ctx holds ids from the seeded data. Each names the
+    status (and redirect target) a successful request gets, so a route that fails
+    early, and so issues fewer commands, can't pass.
+    """
+    sub_id, trashed_id, slot_id = ctx["submission_id"], ctx["trashed_id"], ctx["slot_id"]
+    return [
+        {"name": "form page", "method": "GET", "path": "/", "status": 200},
+        {"name": "slot list", "method": "GET", "path": "/api/slots", "status": 200},
+        {"name": "submit form", "method": "POST", "path": "/", "data": {
+            "reg_no": "23BAI19999", "email": "new.23bai19999@vitbhopal.ac.in",
+            "selected_slots": ["9:00 AM", "11:00 AM"], "idempotency_key": f"round-trip-check-{ctx['size']:04d}"},
+            "status": 303, "location_prefix": "/submitted/"},
+        {"name": "user edit", "method": "POST", "path": f"/edit/{sub_id}", "data": {
+            "email": ctx["email"], "selected_slots": ["11:00 AM"]}, "status": 303, "location": f"/edit/{sub_id}?success=1"},
+        {"name": "admin dashboard", "method": "GET", "path": "/admin/dashboard", "admin": True, "status": 200},
+        {"name": "admin download", "method": "GET", "path": "/admin/download", "admin": True, "status": 200},
+        {"name": "admin edit", "method": "POST", "path": f"/admin/edit/{sub_id}", "admin": True, "data": {
+            "reg_no": ctx["reg_no"], "email": ctx["email"], "selected_slots": ["9:00 AM"]},
+            "status": 303, "location": f"/admin/edit/{sub_id}?success=1"},
+        {"name": "admin delete", "method": "POST", "path": f"/admin/delete/{sub_id}", "admin": True,
+            "status": 303, "location": "/admin/dashboard?view=active"},
+        {"name": "admin restore", "method": "POST", "path": f"/admin/restore/{sub_id}", "admin": True,
+            "status": 303, "location": "/admin/dashboard?view=trash"},
+        {"name": "admin hard delete", "method": "POST", "path": f"/admin/delete/hard/{trashed_id}", "admin": True,
+            "status": 303, "location": "/admin/dashboard?view=trash"},
+        {"name": "admin empty trash", "method": "POST", "path": "/admin/trash/empty", "admin": True,
+            "status": 303, "location": "/admin/dashboard?view=trash"},
+        {"name": "admin logs", "method": "GET", "path": "/admin/logs", "admin": True, "status": 200},
+        {"name": "admin logs export", "method": "GET", "path": "/admin/logs/export", "admin": True, "status": 200},
+        {"name": "api submissions", "method": "GET", "path": "/admin/api/submissions", "admin": True, "status": 200},
+        {"name": "api logs", "method": "GET", "path": "/admin/api/logs", "admin": True, "status": 200},
+        {"name": "admin slots page", "method": "GET", "path": "/admin/slots", "admin": True, "status": 200},
+        {"name": "admin add slot", "method": "POST", "path": "/admin/slots", "admin": True, "data": {"time": "4:00 PM", "capacity": "30"},
+            "status": 303, "location": "/admin/slots"},
+        {"name": "admin slot capacity", "method": "POST", "path": f"/admin/slots/capacity/{slot_id}", "admin": True, "data": {"capacity": "40"},
+            "status": 303, "location": "/admin/slots"},
+        {"name": "admin toggle slot", "method": "POST", "path": f"/admin/slots/toggle/{slot_id}", "admin": True,
+            "status": 303, "location": "/admin/slots"},
+        {"name": "admin delete slot", "method": "POST", "path": f"/admin/slots/delete/{slot_id}", "admin": True,
+            "status": 303, "location": "/admin/slots"},
+    ]
+
+
+async def seed(size: int) -> dict:
+    from app.models import AdminLog, Slot, Submission
+
+    for time in ("9:00 AM", "11:00 AM"):
+        await Slot(time=time).insert()
+    spare_slot = await Slot(time="2:00 PM").insert()
+
+    date_str = resolve_ist_date(None).strftime("%Y-%m-%d")
+
+    submissions = [
+        Submission(reg_no=f"23BAI1{i:04d}", email=f"student.23bai1{i:04d}@vitbhopal.ac.in", slots=["9:00 AM", "11:00 AM"], date_str=date_str)
+        for i in range(size)
+    ]
+    # The trash scales with the day too, so emptying it is measured at both sizes
+    trashed = [
+        Submission(reg_no=f"23BAI2{i:04d}", email=f"student.23bai2{i:04d}@vitbhopal.ac.in", slots=["9:00 AM"], date_str=date_str, deleted_at=datetime.utcnow())
+        for i in range(size)
+    ]
+    await Submission.insert_many(submissions + trashed)
+    await AdminLog.insert_many([AdminLog(action="login") for _ in range(size)])
+
+    first = await Submission.find_one(Submission.reg_no == "23BAI10000")
+    first_trashed = await Submission.find_one(Submission.reg_no == "23BAI20000")
+    # Idempotency keys are remembered in process memory, so each run needs its own
+    return {"size": size, "submission_id": str(first.id), "reg_no": first.reg_no, "email": first.email,
+            "trashed_id": str(first_trashed.id), "slot_id": str(spare_slot.id)}
+
+
+def measure(size: int, counter: CommandCounter, monkeypatch) -> dict:
+    """Run every scenario against a fresh in-memory database seeded with `size` submissions"""
+    client = AsyncMongoMockClient()
+    monkeypatch.setattr(database, "AsyncIOMotorClient", lambda *args, **kwargs: client)
+
+    counts = {}
+    with TestClient(main.app) as http:
+        ctx = http.portal.call(seed, size)
+        # Warm the per-worker caches outside the measurement
+        profiling.config_cache.invalidate()
+        archive.state_cache.invalidate()
+        http.get("/")
+        http.portal.call(archive.state_cache.archived_before)
+        admin_cookie = {settings.SESSION_COOKIE: signer.dumps({"user": settings.ADMIN_USER})}
+
+        for scenario in scenarios(ctx):
+            http.cookies.clear()
+            if scenario.get("admin"):
+                http.cookies.update(admin_cookie)
+            counter.reset()
+            response = http.request(scenario["method"], scenario["path"], data=scenario.get("data"), follow_redirects=False)
+            counts[scenario["name"]] = {
+                "count": counter.total,
+                "commands": dict(counter.commands),
+                "response": (response.status_code, response.headers.get("location")),
+                "scenario": scenario,
+            }
+    return counts
+
+
+@pytest.fixture(scope="module")
+def route_counts():
+    """(small, large) per-route counts; the mongomock patches only live inside this fixture"""
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        counter = CommandCounter()
+        instrument_mongomock(monkeypatch, counter)
+        yield measure(2, counter, monkeypatch), measure(25, counter, monkeypatch)
+
+
+def test_every_scenario_has_a_budget():
+    ctx = {"size": 0, "submission_id": "", "trashed_id": "", "slot_id": "", "reg_no": "", "email": ""}
+    assert {s["name"] for s in scenarios(ctx)} == set(ROUTE_BUDGETS)
+
+
+@pytest.mark.parametrize("route", ROUTE_BUDGETS)
+def test_route_succeeds(route_counts, route):
+    """A route that fails early issues fewer commands, so its count only means something if it succeeded"""
+    for counts in route_counts:
+        scenario = counts[route]["scenario"]
+        status, location = counts[route]["response"]
+        assert status == scenario["status"], f"status {status}, location {location}"
+        if "location" in scenario:
+            assert location == scenario["location"]
+        if "location_prefix" in scenario:
+            assert location and location.startswith(scenario["location_prefix"]), location
+
+
+@pytest.mark.parametrize("route", ROUTE_BUDGETS)
+def test_route_within_budget(route_counts, route):
+    _, large = route_counts
+    count, commands = large[route]["count"], large[route]["commands"]
+    assert count <= ROUTE_BUDGETS[route], f"{count} round trips ({commands}), budget {ROUTE_BUDGETS[route]}"
+
+
+@pytest.mark.parametrize("route", ROUTE_BUDGETS)
+def test_route_does_not_grow_with_data(route_counts, route):
+    small, large = route_counts
+    assert large[route]["count"] <= small[route]["count"], f"N+1: {small[route]['commands']} -> {large[route]['commands']}"